@@ -3,49 +3,75 @@ PDF Chat RAG Application - Main Streamlit App
 """
 import streamlit as st
 import os
+import uuid
+from functools import partial
 
 from config.settings import settings
 from src.utils.logger import logger
-from src.services.pdf_processor import PDFProcessor
+from src.services.engine import RAGEngine
 from src.services.vectorstore import VectorStoreService
-from src.services.rag_chain import RAGChain
 from src.ui.templates import CSS
 from src.ui.components import (
     render_chat_history,
     render_sidebar_upload,
     render_process_button,
-    render_clear_button
+    render_clear_button,
+    render_retrieval_settings,
+    reset_rendered_history
 )
 
 os.environ["GROQ_API_KEY"] = st.secrets["GROQ_API_KEY"]
 
+def get_session_id() -> str:
+    """
+    Get the conversation id from the URL, creating one if missing.
+    
+    Keeping it in the query string lets a reload or a new pod resume
+    the same conversation.
+    
+    Returns:
+        str: Conversation session id
+    """
+    session_id = st.query_params.get("sid")
+    if not session_id:
+        session_id = uuid.uuid4().hex
+        st.query_params["sid"] = session_id
+    return session_id
+
+
+@st.cache_resource
+def get_vectorstore_service() -> VectorStoreService:
+    """Embedding model and query encoder shared by all sessions."""
+    return VectorStoreService()
+
+
 def initialize_session_state() -> None:
     """Initialize Streamlit session state variables."""
-    if "rag_chain" not in st.session_state:
-        st.session_state.rag_chain = None
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = get_session_id()
+    if "engine" not in st.session_state:
+        st.session_state.engine = RAGEngine(vectorstore_service=get_vectorstore_service())
     if "chat_history" not in st.session_state:
-        st.session_state.chat_history = []
+        st.session_state.chat_history = st.session_state.engine.get_history(
+            st.session_state.session_id
+        )
     if "processed" not in st.session_state:
         st.session_state.processed = False
 
 
 def process_pdfs(uploaded_files) -> None:
     """
-    Process uploaded PDFs and create RAG chain.
+    Process uploaded PDFs into a fresh index for this session.
     
     Args:
         uploaded_files: List of uploaded PDF files
     """
     try:
         with st.spinner("Processing PDFs & building vector store..."):
-            pdf_processor = PDFProcessor()
-            chunks = pdf_processor.process_pdfs(uploaded_files)
-            
-            vectorstore_service = VectorStoreService()
-            vectorstore = vectorstore_service.create_vectorstore(chunks)
-            retriever = vectorstore_service.get_retriever(vectorstore)
+            engine = RAGEngine(vectorstore_service=get_vectorstore_service())
+            engine.ingest_uploads(uploaded_files)
             
-            st.session_state.rag_chain = RAGChain(retriever)
+            st.session_state.engine = engine
             st.session_state.processed = True
             
         st.success("🎉 PDFs processed successfully! You can now ask questions.")
@@ -55,14 +81,15 @@ def process_pdfs(uploaded_files) -> None:
         logger.error(f"PDF processing failed: {str(e)}")
 
 
-def handle_user_question(question: str) -> None:
+def handle_user_question(question: str, search_kwargs: dict) -> None:
     """
     Handle user question and display response.
     
     Args:
         question: User's question
+        search_kwargs: Retrieval overrides for this question
     """
-    if not st.session_state.rag_chain:
+    if not st.session_state.engine.ready:
         st.warning("⚠️ Please upload and process PDFs first!")
         return
     
@@ -74,7 +101,9 @@ def handle_user_question(question: str) -> None:
     
     try:
         with st.spinner("🤔 Thinking..."):
-            answer, history = st.session_state.rag_chain.ask(question)
+            answer, history = st.session_state.engine.ask(
+                question, st.session_state.session_id, search_kwargs
+            )
             st.session_state.chat_history = history
             # Store the last question and response to prevent duplicates
             st.session_state.last_question = question
@@ -119,19 +148,25 @@ def main():
             process_pdfs(uploaded_files)
     
     if render_clear_button():
-        if st.session_state.rag_chain:
-            st.session_state.rag_chain.clear_memory()
-            st.session_state.chat_history = []
-            st.success("✅ Chat history cleared!")
-            st.rerun()
+        st.session_state.engine.clear_memory(st.session_state.session_id)
+        st.session_state.chat_history = []
+        reset_rendered_history()
+        st.success("✅ Chat history cleared!")
+        st.rerun()
     
+    search_kwargs = {}
     if st.session_state.processed:
         st.sidebar.success("✅ PDFs Ready for Questions")
+        search_kwargs = render_retrieval_settings(st.session_state.engine.sources)
     
     if st.session_state.chat_history:
-        st.markdown('<div class="chat-container">', unsafe_allow_html=True)
-        render_chat_history(st.session_state.chat_history)
-        st.markdown('</div>', unsafe_allow_html=True)
+        load_earlier = None
+        if len(st.session_state.chat_history) >= settings.HISTORY_WINDOW:
+            # Older messages are only in the history store
+            load_earlier = partial(
+                st.session_state.engine.get_history_before, st.session_state.session_id
+            )
+        render_chat_history(st.session_state.chat_history, load_earlier=load_earlier)
     else:
         st.info("👋 Upload PDFs and start asking questions to begin the conversation!")
     
@@ -152,7 +187,7 @@ def main():
         ask_button = st.button("Send 📤", use_container_width=True, type="primary")
     
     if (ask_button or user_question) and user_question:
-        handle_user_question(user_question)
+        handle_user_question(user_question, search_kwargs)
 
 
 if __name__ == "__main__":
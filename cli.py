@@ -0,0 +1,101 @@
+"""
+PDF Chat RAG Application - Command Line Interface
+
+Usage:
+    python cli.py ingest ./papers --recursive
+    python cli.py serve --workers 4
+"""
+import argparse
+import glob
+import os
+import sys
+from typing import List
+
+from config.settings import settings
+from src.utils.logger import logger
+
+
+def find_pdfs(folder: str, recursive: bool) -> List[str]:
+    """
+    Find PDF files in a folder.
+
+    Args:
+        folder: Folder to search
+        recursive: Whether to search subfolders
+
+    Returns:
+        List[str]: Sorted PDF paths
+    """
+    pattern = os.path.join(folder, "**", "*") if recursive else os.path.join(folder, "*")
+    return sorted(
+        path for path in glob.glob(pattern, recursive=recursive)
+        if os.path.isfile(path) and path.lower().endswith(".pdf")
+    )
+
+
+def ingest(args: argparse.Namespace) -> int:
+    """Ingest a folder of PDFs into the persistent index in batches."""
+    from src.services.engine import RAGEngine
+
+    paths = find_pdfs(args.folder, args.recursive)
+    if not paths:
+        logger.error(f"No PDF files found in {args.folder}")
+        return 1
+
+    engine = RAGEngine(index_dir=args.index_dir)
+    total_chunks = 0
+    for start in range(0, len(paths), args.batch_size):
+        batch = paths[start:start + args.batch_size]
+        total_chunks += engine.ingest_paths(batch)
+        logger.info(f"Ingested {start + len(batch)}/{len(paths)} PDF(s)")
+
+    logger.info(f"✓ Added {total_chunks} chunks from {len(paths)} PDF(s) to {args.index_dir}")
+    return 0
+
+
+def serve(args: argparse.Namespace) -> int:
+    """Run the REST server."""
+    import uvicorn
+
+    # A single worker runs in this process, where settings are already loaded;
+    # multiple workers import server.py fresh and read INDEX_DIR from the environment
+    settings.INDEX_DIR = args.index_dir
+    os.environ["INDEX_DIR"] = args.index_dir
+    uvicorn.run("server:app", host=args.host, port=args.port, workers=args.workers)
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="PDF Chat RAG command line interface")
+    parser.add_argument(
+        "--index-dir",
+        default=settings.INDEX_DIR,
+        help=f"Persistent index directory (default: {settings.INDEX_DIR})"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = subparsers.add_parser("ingest", help="Ingest a folder of PDFs")
+    ingest_parser.add_argument("folder", help="Folder containing PDF files")
+    ingest_parser.add_argument("-r", "--recursive", action="store_true", help="Include subfolders")
+    ingest_parser.add_argument(
+        "--batch-size", type=int, default=20, help="PDFs processed per index update"
+    )
+    ingest_parser.set_defaults(func=ingest)
+
+    serve_parser = subparsers.add_parser("serve", help="Run the REST server")
+    serve_parser.add_argument("--host", default=settings.SERVER_HOST)
+    serve_parser.add_argument("--port", type=int, default=settings.SERVER_PORT)
+    serve_parser.add_argument("--workers", type=int, default=settings.SERVER_WORKERS)
+    serve_parser.set_defaults(func=serve)
+
+    return parser
+
+
+def main() -> int:
+    """Main CLI entry point."""
+    args = build_parser().parse_args()
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
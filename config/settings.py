@@ -14,13 +14,56 @@ class Settings:
     
     LLM_MODEL: str = "llama-3.3-70b-versatile"
     LLM_TEMPERATURE: float = 0.2
+    LLM_FAST_MODEL: str = os.getenv("LLM_FAST_MODEL", "")
+    FAST_ROUTE_MIN_SCORE: float = float(os.getenv("FAST_ROUTE_MIN_SCORE", "0.6"))
+    FAST_ROUTE_MAX_WORDS: int = int(os.getenv("FAST_ROUTE_MAX_WORDS", "12"))
+    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "3"))
+    LLM_BACKOFF_BASE: float = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+    LLM_BACKOFF_MAX: float = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+    LLM_REQUESTS_PER_MINUTE: float = float(os.getenv("LLM_REQUESTS_PER_MINUTE", "30"))
+    LLM_TOKENS_PER_MINUTE: float = float(os.getenv("LLM_TOKENS_PER_MINUTE", "0"))
+
+    LLM_FALLBACK_BASE_URL: str = os.getenv("LLM_FALLBACK_BASE_URL", "")
+    LLM_FALLBACK_API_KEY: str = os.getenv("LLM_FALLBACK_API_KEY", "")
+    LLM_FALLBACK_MODEL: str = os.getenv("LLM_FALLBACK_MODEL", "")
+    LLM_FALLBACK_REQUESTS_PER_MINUTE: float = float(
+        os.getenv("LLM_FALLBACK_REQUESTS_PER_MINUTE", "0")
+    )
+
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    QUERY_CACHE_SIZE: int = int(os.getenv("QUERY_CACHE_SIZE", "1024"))
+    QUERY_BATCH_WINDOW_MS: float = float(os.getenv("QUERY_BATCH_WINDOW_MS", "5"))
+    QUERY_BATCH_MAX_SIZE: int = int(os.getenv("QUERY_BATCH_MAX_SIZE", "32"))
     
     CHUNK_SIZE: int = 1000
     CHUNK_OVERLAP: int = 200
-    
+
+    RETRIEVAL_SEARCH_TYPE: str = os.getenv("RETRIEVAL_SEARCH_TYPE", "similarity")
+    RETRIEVAL_K: int = int(os.getenv("RETRIEVAL_K", "4"))
+    RETRIEVAL_FETCH_K: int = int(os.getenv("RETRIEVAL_FETCH_K", "20"))
+    RETRIEVAL_MMR_LAMBDA: float = float(os.getenv("RETRIEVAL_MMR_LAMBDA", "0.5"))
+    RETRIEVAL_MAX_PER_SOURCE: int = int(os.getenv("RETRIEVAL_MAX_PER_SOURCE", "0"))
+    RETRIEVAL_ADAPTIVE_K: bool = os.getenv("RETRIEVAL_ADAPTIVE_K", "true").lower() == "true"
+    RETRIEVAL_MIN_K: int = int(os.getenv("RETRIEVAL_MIN_K", "1"))
+    RETRIEVAL_SCORE_GAP: float = float(os.getenv("RETRIEVAL_SCORE_GAP", "0.1"))
+    RETRIEVAL_MIN_SCORE: float = float(os.getenv("RETRIEVAL_MIN_SCORE", "0.2"))
+
+    INDEX_DIR: str = os.getenv("INDEX_DIR", "data/index")
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("SERVER_PORT", "8000"))
+    SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", "1"))
+
+    HISTORY_BACKEND: str = os.getenv("HISTORY_BACKEND", "sqlite")
+    HISTORY_DB_PATH: str = os.getenv("HISTORY_DB_PATH", "data/chat_history.db")
+    HISTORY_WINDOW: int = int(os.getenv("HISTORY_WINDOW", "40"))
+    HISTORY_PROMPT_MESSAGES: int = int(os.getenv("HISTORY_PROMPT_MESSAGES", "10"))
+    HISTORY_IDLE_SECONDS: float = float(os.getenv("HISTORY_IDLE_SECONDS", "1800"))
+
     PAGE_TITLE: str = "Chat with PDFs (Groq)"
     PAGE_ICON: str = "📚"
+    CHAT_PAGE_SIZE: int = int(os.getenv("CHAT_PAGE_SIZE", "20"))
     
     LOG_LEVEL: str = "INFO"
     LOG_FORMAT: str = "%(asctime)s [%(levelname)s] %(name)s: %(message)s"
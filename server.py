@@ -0,0 +1,148 @@
+"""
+PDF Chat RAG Application - Headless REST Server
+
+Run with ``python cli.py serve`` or ``uvicorn server:app --workers N``.
+All workers share the persistent index in ``settings.INDEX_DIR``.
+"""
+import os
+import shutil
+import tempfile
+from contextlib import asynccontextmanager
+from dataclasses import replace
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, File, HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
+
+from config.settings import settings
+from src.services.engine import RAGEngine
+from src.services.retriever import RetrievalConfig
+from src.utils.logger import logger
+from src.utils.metrics import query_cache_to_prometheus, route_metrics
+
+
+class QueryRequest(BaseModel):
+    """Question payload for the query endpoints."""
+
+    question: str
+    session_id: str = "default"
+    search_kwargs: Optional[Dict[str, Any]] = None
+
+
+class QueryResponse(BaseModel):
+    """Answer returned by the query endpoint."""
+
+    answer: str
+    session_id: str
+
+
+class IngestResponse(BaseModel):
+    """Result of a document upload."""
+
+    files: int
+    chunks: int
+
+
+@lru_cache(maxsize=1)
+def get_engine() -> RAGEngine:
+    """Engine for this worker process, backed by the shared on-disk index."""
+    return RAGEngine(index_dir=settings.INDEX_DIR)
+
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    settings.validate()
+    await run_in_threadpool(get_engine)
+    logger.info("✓ RAG server ready")
+    yield
+
+
+app = FastAPI(title=settings.PAGE_TITLE, lifespan=lifespan)
+
+
+async def _require_ready(engine: RAGEngine) -> None:
+    # ready may reload the index written by another worker
+    if not await run_in_threadpool(lambda: engine.ready):
+        raise HTTPException(status_code=409, detail="No documents have been ingested yet")
+
+
+def _validate_search_kwargs(search_kwargs: Optional[Dict[str, Any]]) -> None:
+    """Reject unknown or invalid retrieval options before any work is done."""
+    try:
+        replace(RetrievalConfig(), **(search_kwargs or {})).validate()
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid search_kwargs: {e}")
+
+
+@app.get("/health")
+async def health() -> Dict[str, Any]:
+    sources = await run_in_threadpool(lambda: get_engine().sources)
+    return {"status": "ok", "ready": bool(sources), "sources": sources}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    """Per-route answer and query cache counters of this worker in Prometheus format."""
+    encoder = get_engine().vectorstore_service.query_encoder
+    return route_metrics.to_prometheus() + query_cache_to_prometheus(encoder.stats())
+
+
+@app.post("/documents", response_model=IngestResponse)
+async def upload_documents(files: List[UploadFile] = File(...)) -> IngestResponse:
+    """Upload PDFs and add them to the shared index."""
+    upload_dir = tempfile.mkdtemp(prefix="pdf-upload-")
+    try:
+        paths = []
+        for upload in files:
+            if not upload.filename or not upload.filename.lower().endswith(".pdf"):
+                raise HTTPException(status_code=400, detail=f"Not a PDF: {upload.filename}")
+            path = os.path.join(upload_dir, os.path.basename(upload.filename))
+            with open(path, "wb") as f:
+                f.write(await upload.read())
+            paths.append(path)
+
+        chunks = await run_in_threadpool(get_engine().ingest_paths, paths)
+        return IngestResponse(files=len(paths), chunks=chunks)
+    finally:
+        shutil.rmtree(upload_dir, ignore_errors=True)
+
+
+@app.post("/query", response_model=QueryResponse)
+async def query(request: QueryRequest) -> QueryResponse:
+    """Answer a question in a conversation session."""
+    _validate_search_kwargs(request.search_kwargs)
+    engine = get_engine()
+    await _require_ready(engine)
+    answer, _ = await run_in_threadpool(
+        engine.ask, request.question, request.session_id, request.search_kwargs
+    )
+    return QueryResponse(answer=answer, session_id=request.session_id)
+
+
+@app.post("/query/stream")
+async def query_stream(request: QueryRequest) -> StreamingResponse:
+    """Stream the answer to a question as plain text chunks."""
+    _validate_search_kwargs(request.search_kwargs)
+    engine = get_engine()
+    await _require_ready(engine)
+    # Retrieval runs here so that its errors surface before the 200 is sent
+    chunks = await run_in_threadpool(
+        engine.stream, request.question, request.session_id, request.search_kwargs
+    )
+    return StreamingResponse(chunks, media_type="text/plain; charset=utf-8")
+
+
+@app.get("/sessions/{session_id}/history")
+async def get_history(session_id: str) -> List[Dict[str, str]]:
+    """Recent messages of a conversation session."""
+    messages = await run_in_threadpool(get_engine().get_history, session_id)
+    return [{"role": m.type, "content": m.content} for m in messages]
+
+
+@app.delete("/sessions/{session_id}/history", status_code=204)
+async def clear_history(session_id: str) -> None:
+    """Delete a conversation session."""
+    await run_in_threadpool(get_engine().clear_memory, session_id)
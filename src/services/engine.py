@@ -0,0 +1,244 @@
+"""
+RAG engine shared by the Streamlit UI, the REST server and the CLI.
+"""
+import os
+import threading
+import uuid
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+from langchain_core.messages import BaseMessage
+
+from config.settings import settings
+from src.services.history_store import get_history_store
+from src.services.pdf_processor import PDFProcessor
+from src.services.rag_chain import RAGChain
+from src.services.retriever import VectorRetriever
+from src.services.vectorstore import VectorStoreService
+from src.utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process locking, single worker only
+    fcntl = None
+
+
+class RAGEngine:
+    """
+    Ingest PDFs into a vector index and answer questions over it.
+
+    With an ``index_dir`` the index is persisted on disk and guarded by a
+    file lock, so several worker processes can share it: writers take an
+    exclusive lock and bump a version file, readers reload whenever the
+    version changed. Without one the index lives only in this process.
+    """
+
+    VERSION_FILE = "VERSION"
+    LOCK_FILE = ".lock"
+
+    def __init__(
+        self,
+        index_dir: Optional[str] = None,
+        vectorstore_service: Optional[VectorStoreService] = None,
+        pdf_processor: Optional[PDFProcessor] = None
+    ):
+        """
+        Initialize RAG engine.
+
+        Args:
+            index_dir: Directory of the persistent index, None for in-memory
+            vectorstore_service: Embedding service, created if not given
+            pdf_processor: PDF processor, created if not given
+        """
+        self.index_dir = index_dir
+        self.vectorstore_service = vectorstore_service or VectorStoreService()
+        self.pdf_processor = pdf_processor or PDFProcessor()
+
+        self.vectorstore: Optional[FAISS] = None
+        self.retriever: Optional[VectorRetriever] = None
+        self.rag_chain: Optional[RAGChain] = None
+        self._version: Optional[str] = None
+        self._lock = threading.RLock()
+
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+            self.refresh()
+
+    @property
+    def ready(self) -> bool:
+        """Whether any documents have been ingested."""
+        self.refresh()
+        return self.retriever is not None
+
+    @property
+    def sources(self) -> List[str]:
+        """Names of the indexed PDF files."""
+        return self.retriever.sources if self.ready else []
+
+    @contextmanager
+    def _index_lock(self, exclusive: bool):
+        if not self.index_dir or fcntl is None:
+            yield
+            return
+        with open(os.path.join(self.index_dir, self.LOCK_FILE), "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _read_version(self) -> Optional[str]:
+        try:
+            with open(os.path.join(self.index_dir, self.VERSION_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def _write_version(self) -> str:
+        version = uuid.uuid4().hex
+        path = os.path.join(self.index_dir, self.VERSION_FILE)
+        with open(f"{path}.tmp", "w") as f:
+            f.write(version)
+        os.replace(f"{path}.tmp", path)
+        return version
+
+    def _set_vectorstore(self, vectorstore: FAISS) -> None:
+        """Point the retriever and chain at a new index, keeping conversation sessions."""
+        self.vectorstore = vectorstore
+        self.retriever = self.vectorstore_service.get_retriever(vectorstore)
+        if self.rag_chain is not None:
+            self.rag_chain.retriever = self.retriever
+
+    def refresh(self) -> bool:
+        """
+        Reload the on-disk index if another process changed it.
+
+        Returns:
+            bool: True if the index was reloaded
+        """
+        if not self.index_dir or self._read_version() in (None, self._version):
+            return False
+
+        with self._lock, self._index_lock(exclusive=False):
+            version = self._read_version()
+            if version in (None, self._version):
+                return False
+            self._set_vectorstore(self.vectorstore_service.load_vectorstore(self.index_dir))
+            self._version = version
+        return True
+
+    def _add_chunks(self, chunks: List[Document]) -> None:
+        if not chunks:
+            return
+
+        with self._lock, self._index_lock(exclusive=True):
+            if self.index_dir:
+                version = self._read_version()
+                if version not in (None, self._version):
+                    self.vectorstore = self.vectorstore_service.load_vectorstore(self.index_dir)
+                    self._version = version
+
+            if self.vectorstore is None:
+                vectorstore = self.vectorstore_service.create_vectorstore(chunks)
+            else:
+                vectorstore = self.vectorstore_service.add_documents(self.vectorstore, chunks)
+
+            if self.index_dir:
+                self.vectorstore_service.save_vectorstore(vectorstore, self.index_dir)
+                self._version = self._write_version()
+
+            self._set_vectorstore(vectorstore)
+
+    def ingest_uploads(self, uploaded_files: List) -> int:
+        """
+        Ingest uploaded PDF files.
+
+        Args:
+            uploaded_files: File-like objects with ``name`` and ``read()``
+
+        Returns:
+            int: Number of chunks added
+        """
+        chunks = self.pdf_processor.process_pdfs(uploaded_files)
+        self._add_chunks(chunks)
+        return len(chunks)
+
+    def ingest_paths(self, paths: List[str]) -> int:
+        """
+        Ingest PDF files from disk.
+
+        Args:
+            paths: Paths of PDF files
+
+        Returns:
+            int: Number of chunks added
+        """
+        chunks = self.pdf_processor.process_paths(paths)
+        self._add_chunks(chunks)
+        return len(chunks)
+
+    def _require_chain(self) -> RAGChain:
+        # Created on first question so that ingest-only use needs no LLM credentials
+        if not self.ready:
+            raise RuntimeError("No documents have been ingested yet")
+        with self._lock:
+            if self.rag_chain is None:
+                self.rag_chain = RAGChain(self.retriever)
+        return self.rag_chain
+
+    def ask(
+        self,
+        question: str,
+        session_id: str = "default",
+        search_kwargs: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, List[BaseMessage]]:
+        """
+        Answer a question.
+
+        Args:
+            question: User question
+            session_id: Conversation to answer in
+            search_kwargs: Retrieval overrides for this question
+
+        Returns:
+            Tuple[str, List[BaseMessage]]: Answer and recent session messages
+        """
+        return self._require_chain().ask(question, search_kwargs, session_id=session_id)
+
+    def stream(
+        self,
+        question: str,
+        session_id: str = "default",
+        search_kwargs: Optional[Dict[str, Any]] = None
+    ) -> Iterator[str]:
+        """
+        Stream an answer as text chunks.
+
+        Args:
+            question: User question
+            session_id: Conversation to answer in
+            search_kwargs: Retrieval overrides for this question
+
+        Returns:
+            Iterator[str]: Answer text chunks
+        """
+        return self._require_chain().stream(question, search_kwargs, session_id=session_id)
+
+    def get_history(self, session_id: str = "default") -> List[BaseMessage]:
+        """Recent messages of a session."""
+        if self.rag_chain is not None:
+            return self.rag_chain.get_history(session_id)
+        return get_history_store().load_recent(session_id, settings.HISTORY_WINDOW)
+
+    def get_history_before(self, session_id: str, before_id: str, limit: int) -> List[BaseMessage]:
+        """Messages of a session older than ``before_id``, e.g. for paging back."""
+        return get_history_store().load_before(session_id, before_id, limit)
+
+    def clear_memory(self, session_id: str = "default") -> None:
+        """Delete a session's conversation."""
+        if self.rag_chain is not None:
+            self.rag_chain.clear_memory(session_id)
+        else:
+            get_history_store().clear(session_id)
@@ -0,0 +1,235 @@
+"""
+Conversation history backends and per-session chat history.
+"""
+import itertools
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from config.settings import settings
+from src.utils.logger import logger
+
+
+def _to_row(message: BaseMessage) -> tuple:
+    return ("human" if isinstance(message, HumanMessage) else "ai", str(message.content))
+
+
+def _from_row(row_id: int, role: str, content: str) -> BaseMessage:
+    message_class = HumanMessage if role == "human" else AIMessage
+    return message_class(content=content, id=str(row_id))
+
+
+class HistoryStore(ABC):
+    """Storage backend for conversation messages keyed by session id."""
+
+    @abstractmethod
+    def append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        """Append messages to a session and set each message's ``id`` to its row id."""
+
+    @abstractmethod
+    def load_recent(self, session_id: str, limit: int) -> List[BaseMessage]:
+        """Load the last ``limit`` messages of a session, oldest first."""
+
+    @abstractmethod
+    def load_before(self, session_id: str, before_id: str, limit: int) -> List[BaseMessage]:
+        """Load the last ``limit`` messages older than ``before_id``, oldest first."""
+
+    @abstractmethod
+    def last_id(self, session_id: str) -> Optional[str]:
+        """Id of the newest message of a session, or None if it is empty."""
+
+    @abstractmethod
+    def clear(self, session_id: str) -> None:
+        """Delete all messages of a session."""
+
+
+class InMemoryHistoryStore(HistoryStore):
+    """Process-local history store; contents are lost on restart."""
+
+    def __init__(self):
+        self._sessions: Dict[str, List[tuple]] = {}
+        self._next_id = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        with self._lock:
+            rows = self._sessions.setdefault(session_id, [])
+            for message in messages:
+                row_id = next(self._next_id)
+                rows.append((row_id, *_to_row(message)))
+                message.id = str(row_id)
+
+    def load_recent(self, session_id: str, limit: int) -> List[BaseMessage]:
+        with self._lock:
+            rows = self._sessions.get(session_id, [])[-limit:] if limit > 0 else []
+        return [_from_row(*row) for row in rows]
+
+    def load_before(self, session_id: str, before_id: str, limit: int) -> List[BaseMessage]:
+        with self._lock:
+            rows = [row for row in self._sessions.get(session_id, []) if row[0] < int(before_id)]
+        return [_from_row(*row) for row in (rows[-limit:] if limit > 0 else [])]
+
+    def last_id(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            rows = self._sessions.get(session_id)
+            return str(rows[-1][0]) if rows else None
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """Append-only SQLite history store in WAL mode, safe to share between processes."""
+
+    SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    session_id TEXT NOT NULL,
+    role TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_messages_session ON messages (session_id, id);
+"""
+
+    def __init__(self, db_path: str = settings.HISTORY_DB_PATH):
+        """
+        Initialize SQLite history store.
+
+        Args:
+            db_path: Path to the SQLite database file
+        """
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+        logger.info(f"History store opened: {db_path}")
+
+    def append(self, session_id: str, messages: List[BaseMessage]) -> None:
+        now = time.time()
+        with self._lock, self._conn:
+            # One INSERT per message to learn its row id; still a single transaction
+            for message in messages:
+                role, content = _to_row(message)
+                cursor = self._conn.execute(
+                    "INSERT INTO messages (session_id, role, content, created_at) VALUES (?, ?, ?, ?)",
+                    (session_id, role, content, now)
+                )
+                message.id = str(cursor.lastrowid)
+
+    def load_recent(self, session_id: str, limit: int) -> List[BaseMessage]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, role, content FROM ("
+                "  SELECT id, role, content FROM messages"
+                "  WHERE session_id = ? ORDER BY id DESC LIMIT ?"
+                ") ORDER BY id",
+                (session_id, limit)
+            ).fetchall()
+        return [_from_row(*row) for row in rows]
+
+    def load_before(self, session_id: str, before_id: str, limit: int) -> List[BaseMessage]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, role, content FROM ("
+                "  SELECT id, role, content FROM messages"
+                "  WHERE session_id = ? AND id < ? ORDER BY id DESC LIMIT ?"
+                ") ORDER BY id",
+                (session_id, int(before_id), limit)
+            ).fetchall()
+        return [_from_row(*row) for row in rows]
+
+    def last_id(self, session_id: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(id) FROM messages WHERE session_id = ?", (session_id,)
+            ).fetchone()
+        return str(row[0]) if row[0] is not None else None
+
+    def clear(self, session_id: str) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM messages WHERE session_id = ?", (session_id,))
+
+
+class ChatSession:
+    """
+    Recent window of one session's messages, loaded lazily and written through.
+
+    The window is reloaded whenever the store's newest message id differs from
+    the cached one, so turns appended or cleared by other workers are picked up.
+    """
+
+    def __init__(self, session_id: str, store: HistoryStore, window: int = settings.HISTORY_WINDOW):
+        """
+        Initialize chat session.
+
+        Args:
+            session_id: Conversation identifier
+            store: Backend that persists the messages
+            window: Number of recent messages kept in memory
+        """
+        self.session_id = session_id
+        self.store = store
+        self.window = window
+        self.last_access = time.monotonic()
+        self._messages: Optional[List[BaseMessage]] = None
+
+    @property
+    def messages(self) -> List[BaseMessage]:
+        self.last_access = time.monotonic()
+        if self._messages is None or self._is_stale():
+            self._messages = self.store.load_recent(self.session_id, self.window)
+        return self._messages
+
+    def _is_stale(self) -> bool:
+        cached_id = self._messages[-1].id if self._messages else None
+        return self.store.last_id(self.session_id) != cached_id
+
+    def add_messages(self, messages: List[BaseMessage]) -> None:
+        """Persist messages and append them to the in-memory window."""
+        # Load the window before writing, otherwise a lazy load would read the new rows too
+        window = self.messages
+        self.store.append(self.session_id, messages)
+        self._messages = (window + list(messages))[-self.window:]
+
+    def get_messages(self) -> List[BaseMessage]:
+        return self.messages
+
+    def clear(self) -> None:
+        self.store.clear(self.session_id)
+        self._messages = []
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """
+    Get the process-wide history store configured in settings.
+
+    Returns:
+        HistoryStore: Shared history store
+    """
+    global _store
+    with _store_lock:
+        if _store is None:
+            if settings.HISTORY_BACKEND == "sqlite":
+                _store = SQLiteHistoryStore(settings.HISTORY_DB_PATH)
+            elif settings.HISTORY_BACKEND == "memory":
+                _store = InMemoryHistoryStore()
+            else:
+                raise ValueError(f"Unknown HISTORY_BACKEND '{settings.HISTORY_BACKEND}'")
+        return _store
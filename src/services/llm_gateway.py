@@ -0,0 +1,380 @@
+"""
+LLM gateway with request coalescing, rate limiting, retries and provider failover.
+"""
+import hashlib
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import openai
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_openai import ChatOpenAI
+
+from config.settings import settings
+from src.utils.logger import logger
+
+
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """Rough token count of messages, ~4 characters per token."""
+    return max(1, sum(len(str(m.content)) for m in messages) // 4)
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize token bucket.
+
+        Args:
+            per_minute: Refill rate in tokens per minute
+            capacity: Maximum burst size, defaults to one minute of tokens
+            clock: Monotonic clock, injectable for tests
+            sleep: Sleep function, injectable for tests
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """
+        Block until ``amount`` tokens are available and take them.
+
+        Args:
+            amount: Tokens to take, clamped to the bucket capacity
+
+        Returns:
+            float: Total seconds spent waiting
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) / self.rate
+            self._sleep(delay)
+            waited += delay
+
+
+@dataclass
+class LLMProvider:
+    """An OpenAI-compatible chat completion endpoint."""
+
+    name: str
+    base_url: str
+    api_key: str
+    model: str
+    requests_per_minute: float = 0.0
+    tokens_per_minute: float = 0.0
+
+
+class LLMGateway:
+    """Send chat prompts to a list of providers in priority order."""
+
+    def __init__(
+        self,
+        providers: List[LLMProvider],
+        temperature: float = settings.LLM_TEMPERATURE,
+        max_retries: int = settings.LLM_MAX_RETRIES,
+        backoff_base: float = settings.LLM_BACKOFF_BASE,
+        backoff_max: float = settings.LLM_BACKOFF_MAX,
+        timeout: float = settings.LLM_REQUEST_TIMEOUT,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        """
+        Initialize LLM gateway.
+
+        Args:
+            providers: Providers to try, primary first
+            temperature: LLM creativity level
+            max_retries: Retries per provider before failing over
+            backoff_base: Base delay in seconds for exponential backoff
+            backoff_max: Maximum delay in seconds between retries
+            timeout: Per-request timeout in seconds
+            sleep: Sleep function, injectable for tests
+        """
+        if not providers:
+            raise ValueError("LLMGateway requires at least one provider")
+
+        self.providers = providers
+        self.temperature = temperature
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sleep = sleep
+
+        # Retries are handled here so that backoff and failover see every error
+        self._clients = [
+            ChatOpenAI(
+                model=provider.model,
+                temperature=temperature,
+                api_key=provider.api_key,
+                base_url=provider.base_url,
+                timeout=timeout,
+                max_retries=0,
+            )
+            for provider in providers
+        ]
+        self._request_buckets = [
+            TokenBucket(p.requests_per_minute, sleep=sleep) if p.requests_per_minute > 0 else None
+            for p in providers
+        ]
+        self._token_buckets = [
+            TokenBucket(p.tokens_per_minute, sleep=sleep) if p.tokens_per_minute > 0 else None
+            for p in providers
+        ]
+
+        self._inflight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _to_messages(prompt) -> List[BaseMessage]:
+        """Accept a PromptValue or a list of messages."""
+        if hasattr(prompt, "to_messages"):
+            return prompt.to_messages()
+        return list(prompt)
+
+    def _coalesce_key(self, messages: List[BaseMessage]) -> str:
+        payload = json.dumps(
+            [self.temperature, [(m.type, m.content) for m in messages]],
+            ensure_ascii=False,
+            default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _backoff_delay(self, attempt: int, error: Exception) -> float:
+        """Full-jitter exponential backoff, honouring Retry-After on 429s."""
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+        response = getattr(error, "response", None)
+        retry_after = response.headers.get("retry-after") if response is not None else None
+        if retry_after:
+            try:
+                delay = max(delay, min(float(retry_after), self.backoff_max))
+            except ValueError:
+                pass
+        return delay
+
+    def _throttle(self, index: int, messages: List[BaseMessage]) -> None:
+        waited = 0.0
+        if self._request_buckets[index]:
+            waited += self._request_buckets[index].acquire()
+        if self._token_buckets[index]:
+            waited += self._token_buckets[index].acquire(estimate_tokens(messages))
+        if waited:
+            logger.info(f"Throttled {waited:.2f}s for provider {self.providers[index].name}")
+
+    def _call_provider(self, index: int, messages: List[BaseMessage]) -> AIMessage:
+        """Call one provider, retrying transient failures with jittered backoff."""
+        provider = self.providers[index]
+        for attempt in range(self.max_retries + 1):
+            self._throttle(index, messages)
+            try:
+                return self._clients[index].invoke(messages)
+            except RETRYABLE_ERRORS as e:
+                if attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                logger.warning(
+                    f"LLM provider {provider.name} failed ({type(e).__name__}), "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                )
+                self._sleep(delay)
+
+    def _call_with_failover(self, messages: List[BaseMessage]) -> AIMessage:
+        last_error: Optional[Exception] = None
+        for index, provider in enumerate(self.providers):
+            try:
+                return self._call_provider(index, messages)
+            except openai.APIError as e:
+                last_error = e
+                logger.error(f"LLM provider {provider.name} unavailable: {str(e)}")
+        raise last_error
+
+    def _stream_provider(self, index: int, messages: List[BaseMessage]) -> Iterator[str]:
+        """Stream from one provider; transient failures are retried until the first chunk."""
+        provider = self.providers[index]
+        for attempt in range(self.max_retries + 1):
+            self._throttle(index, messages)
+            started = False
+            try:
+                for chunk in self._clients[index].stream(messages):
+                    started = True
+                    yield chunk.content
+                return
+            except RETRYABLE_ERRORS as e:
+                if started or attempt == self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt, e)
+                logger.warning(
+                    f"LLM provider {provider.name} stream failed ({type(e).__name__}), "
+                    f"retry {attempt + 1}/{self.max_retries} in {delay:.2f}s"
+                )
+                self._sleep(delay)
+
+    def stream(self, prompt) -> Iterator[str]:
+        """
+        Stream a completion as text chunks.
+
+        Streams are not coalesced; failover only happens before the first
+        chunk has been sent.
+
+        Args:
+            prompt: PromptValue or list of messages
+
+        Yields:
+            str: Response text chunks
+        """
+        messages = self._to_messages(prompt)
+        last_error: Optional[Exception] = None
+        for index, provider in enumerate(self.providers):
+            started = False
+            try:
+                for text in self._stream_provider(index, messages):
+                    started = True
+                    yield text
+                return
+            except openai.APIError as e:
+                if started:
+                    raise
+                last_error = e
+                logger.error(f"LLM provider {provider.name} unavailable: {str(e)}")
+        raise last_error
+
+    def invoke(self, prompt) -> AIMessage:
+        """
+        Generate a completion, sharing the result with identical in-flight prompts.
+
+        Callers that joined another caller's request get a copy without
+        ``usage_metadata`` and with ``response_metadata["coalesced"]`` set.
+
+        Args:
+            prompt: PromptValue or list of messages
+
+        Returns:
+            AIMessage: Model response
+        """
+        messages = self._to_messages(prompt)
+        key = self._coalesce_key(messages)
+
+        with self._lock:
+            future = self._inflight.get(key)
+            is_leader = future is None
+            if is_leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not is_leader:
+            logger.info("Coalesced identical in-flight LLM request")
+            # Only the leader's call spent tokens; don't let followers count them again
+            result = future.result()
+            return result.model_copy(update={
+                "usage_metadata": None,
+                "response_metadata": {**result.response_metadata, "coalesced": True},
+            })
+
+        try:
+            result = self._call_with_failover(messages)
+            future.set_result(result)
+            return result
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+def default_providers(model_name: str = settings.LLM_MODEL) -> List[LLMProvider]:
+    """
+    Build the provider list from settings.
+
+    Args:
+        model_name: Model to request from the primary provider
+
+    Returns:
+        List[LLMProvider]: Primary provider, plus the fallback if configured
+    """
+    providers = [
+        LLMProvider(
+            name="primary",
+            base_url=settings.LLM_BASE_URL,
+            api_key=settings.GROQ_API_KEY or os.getenv("GROQ_API_KEY", ""),
+            model=model_name,
+            requests_per_minute=settings.LLM_REQUESTS_PER_MINUTE,
+            tokens_per_minute=settings.LLM_TOKENS_PER_MINUTE,
+        )
+    ]
+    if settings.LLM_FALLBACK_BASE_URL:
+        providers.append(
+            LLMProvider(
+                name="fallback",
+                base_url=settings.LLM_FALLBACK_BASE_URL,
+                api_key=settings.LLM_FALLBACK_API_KEY,
+                model=settings.LLM_FALLBACK_MODEL or model_name,
+                requests_per_minute=settings.LLM_FALLBACK_REQUESTS_PER_MINUTE,
+            )
+        )
+    return providers
+
+
+_gateways: Dict[Tuple[str, float], LLMGateway] = {}
+_gateways_lock = threading.Lock()
+
+
+def get_llm_gateway(
+    model_name: str = settings.LLM_MODEL,
+    temperature: float = settings.LLM_TEMPERATURE
+) -> LLMGateway:
+    """
+    Get the process-wide gateway for a model.
+
+    Sessions share one gateway per model so that coalescing and rate limits
+    apply across all of them.
+
+    Args:
+        model_name: Model to request from the primary provider
+        temperature: LLM creativity level
+
+    Returns:
+        LLMGateway: Shared gateway instance
+    """
+    with _gateways_lock:
+        key = (model_name, temperature)
+        if key not in _gateways:
+            _gateways[key] = LLMGateway(default_providers(model_name), temperature=temperature)
+            logger.info(
+                f"LLM gateway ready for {model_name} with "
+                f"{len(_gateways[key].providers)} provider(s)"
+            )
+        return _gateways[key]
@@ -61,6 +61,29 @@ class PDFProcessor:
         logger.info(f"Extracted {len(all_docs)} pages from {len(uploaded_files)} PDF(s)")
         return all_docs
     
+    def extract_documents_from_paths(self, paths: List[str]) -> List[Document]:
+        """
+        Load PDFs from disk and extract documents.
+        
+        Args:
+            paths: Paths of PDF files
+            
+        Returns:
+            List[Document]: Extracted LangChain documents
+        """
+        all_docs = []
+        
+        for path in paths:
+            try:
+                loader = PyPDFLoader(path)
+                all_docs.extend(loader.load())
+            except Exception as e:
+                logger.error(f"Error processing {path}: {str(e)}")
+                raise
+        
+        logger.info(f"Extracted {len(all_docs)} pages from {len(paths)} PDF(s)")
+        return all_docs
+    
     def chunk_documents(self, documents: List[Document]) -> List[Document]:
         """
         Split documents into chunks.
@@ -91,4 +114,17 @@ class PDFProcessor:
         """
         documents = self.extract_documents_from_pdfs(uploaded_files)
         chunks = self.chunk_documents(documents)
-        return chunks
\ No newline at end of file
+        return chunks
+    
+    def process_paths(self, paths: List[str]) -> List[Document]:
+        """
+        Complete PDF processing pipeline for files on disk.
+        
+        Args:
+            paths: Paths of PDF files
+            
+        Returns:
+            List[Document]: Processed and chunked documents
+        """
+        documents = self.extract_documents_from_paths(paths)
+        return self.chunk_documents(documents)
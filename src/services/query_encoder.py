@@ -0,0 +1,158 @@
+"""
+Query encoder with an LRU embedding cache and micro-batched encoding.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from config.settings import settings
+from src.utils.logger import logger
+
+
+class QueryEncoder:
+    """
+    Embed user questions, sharing work across concurrent sessions.
+
+    Repeated questions are served from an LRU cache. Cache misses are queued
+    and a background thread encodes everything that arrives within
+    ``batch_window_ms`` in a single batched forward pass.
+    """
+
+    def __init__(
+        self,
+        embeddings,
+        cache_size: int = settings.QUERY_CACHE_SIZE,
+        batch_window_ms: float = settings.QUERY_BATCH_WINDOW_MS,
+        max_batch_size: int = settings.QUERY_BATCH_MAX_SIZE
+    ):
+        """
+        Initialize query encoder.
+
+        Args:
+            embeddings: LangChain embedding model
+            cache_size: Maximum number of cached query embeddings, 0 disables
+            batch_window_ms: Time to wait for more questions, 0 disables batching
+            max_batch_size: Maximum questions per batched call
+        """
+        self.embeddings = embeddings
+        self.cache_size = cache_size
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self._cache: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_lock = threading.Lock()
+
+    def _cache_get(self, key: str) -> Optional[List[float]]:
+        with self._cache_lock:
+            vector = self._cache.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._cache.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def _cache_put(self, key: str, vector: List[float]) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            self._cache[key] = vector
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _ensure_worker(self) -> None:
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="query-encoder", daemon=True
+                )
+                self._worker.start()
+
+    def _collect_batch(self) -> List[Tuple[str, Future]]:
+        """Block for one request, then gather more until the window closes."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.batch_window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            pending: Dict[str, List[Future]] = {}
+            for text, future in batch:
+                pending.setdefault(text, []).append(future)
+
+            texts = list(pending)
+            try:
+                # Query and document encoding are identical for the configured
+                # sentence-transformers model, so one batched call serves all
+                vectors = self.embeddings.embed_documents(texts)
+            except Exception as e:
+                logger.error(f"Query encoding failed: {str(e)}")
+                for futures in pending.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+
+            if len(texts) > 1:
+                logger.info(f"Encoded {len(texts)} queries in one batch")
+            for text, vector in zip(texts, vectors):
+                for future in pending[text]:
+                    future.set_result(vector)
+
+    def embed_query(self, text: str) -> List[float]:
+        """
+        Embed a single question.
+
+        Args:
+            text: Question text
+
+        Returns:
+            List[float]: Query embedding
+        """
+        key = text.strip()
+        vector = self._cache_get(key)
+        if vector is not None:
+            return vector
+
+        if self.batch_window <= 0:
+            vector = self.embeddings.embed_query(key)
+        else:
+            self._ensure_worker()
+            future: Future = Future()
+            self._queue.put((key, future))
+            vector = future.result()
+
+        self._cache_put(key, vector)
+        return vector
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters since start.
+
+        Returns:
+            Dict[str, int]: Cache hits and misses
+        """
+        with self._cache_lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents directly; document chunks are not cached."""
+        return self.embeddings.embed_documents(texts)
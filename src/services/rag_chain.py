@@ -1,37 +1,29 @@
 """
 RAG chain service for question answering — fully updated for the new LangChain API.
 """
-from typing import Tuple, List, Dict
+import threading
+import time
+from typing import Any, Iterator, Tuple, List, Dict, Optional
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
-from langchain_core.runnables import RunnableWithMessageHistory
-from langchain_openai import ChatOpenAI
+from langchain_core.runnables import RunnableLambda
 
 from config.settings import settings
+from src.services.history_store import ChatSession, HistoryStore, get_history_store
+from src.services.llm_gateway import LLMGateway, estimate_tokens, get_llm_gateway
 from src.utils.logger import logger
-
-
-class InMemoryChatHistory:
-    """Simple chat history store compatible with RunnableWithMessageHistory."""
-
-    def __init__(self):
-        self.messages: List[BaseMessage] = []
-
-    def add_messages(self, messages: List[BaseMessage]):
-        """Add a list of messages (user or AI) to the history."""
-        self.messages.extend(messages)
-
-    def get_messages(self) -> List[BaseMessage]:
-        return self.messages
-
-    def clear(self):
-        self.messages = []
-
+from src.utils.metrics import route_metrics
 
 
 class RAGChain:
     """Retrieval-Augmented Generation chain using the modern LangChain architecture."""
 
+    ROUTE_FULL = "full"
+    ROUTE_FAST = "fast"
+    ROUTE_NO_CONTEXT = "no_context"
+
+    NOT_AVAILABLE_ANSWER = "This information is not available in the document"
+
     PROMPT_TEMPLATE = """
 You are an expert document analyst providing precise, clear, and well-structured answers from PDF documents.
 
@@ -59,45 +51,59 @@ YOUR ANSWER:
         retriever,
         model_name: str = settings.LLM_MODEL,
         temperature: float = settings.LLM_TEMPERATURE,
+        gateway: Optional[LLMGateway] = None,
+        history_store: Optional[HistoryStore] = None,
+        fast_gateway: Optional[LLMGateway] = None,
     ):
         """
         Args:
             retriever: Vector retriever instance
             model_name: Groq model (e.g., "mixtral-8x7b")
             temperature: LLM creativity level
+            gateway: LLM gateway, defaults to the shared one for model_name
+            history_store: Conversation backend, defaults to the one in settings
+            fast_gateway: LLM gateway for simple lookups, defaults to the shared
+                one for LLM_FAST_MODEL (none when that is unset)
         """
         self.retriever = retriever
 
-        self.llm = ChatOpenAI(
-            model=model_name,
-            temperature=temperature,
-            api_key=settings.GROQ_API_KEY,
-            base_url="https://api.groq.com/openai/v1",
+        self.llm = gateway or get_llm_gateway(model_name, temperature)
+        self.fast_llm = fast_gateway or (
+            get_llm_gateway(settings.LLM_FAST_MODEL, temperature)
+            if settings.LLM_FAST_MODEL else None
         )
 
         self.prompt = ChatPromptTemplate.from_template(self.PROMPT_TEMPLATE)
 
-        self.history_store: Dict[str, InMemoryChatHistory] = {
-            "default": InMemoryChatHistory()
-        }
+        self.history_store = history_store or get_history_store()
+        self.sessions: Dict[str, ChatSession] = {}
+        self._sessions_lock = threading.Lock()
 
-        self.chain = RunnableWithMessageHistory(
-            self._base_chain(),
-            self._get_chat_history,
-            input_messages_key="question",
-            history_messages_key="chat_history",
-        )
+        self.chain = self._base_chain(self.llm)
+        self.fast_chain = self._base_chain(self.fast_llm) if self.fast_llm else None
 
         logger.info(f"✓ RAG chain initialized using model: {model_name}")
 
-
-    def _base_chain(self):
+    def _base_chain(self, llm: LLMGateway):
         """LLM chain pipeline structure."""
-        return self.prompt | self.llm
-
-    def _get_chat_history(self, session_id: str):
-        """Get chat history for the active session."""
-        return self.history_store[session_id]
+        return self.prompt | RunnableLambda(llm.invoke)
+
+    def _get_chat_history(self, session_id: str) -> ChatSession:
+        """Get chat history for a session, evicting sessions that went idle."""
+        with self._sessions_lock:
+            now = time.monotonic()
+            idle = [
+                sid for sid, session in self.sessions.items()
+                if sid != session_id and now - session.last_access > settings.HISTORY_IDLE_SECONDS
+            ]
+            for sid in idle:
+                del self.sessions[sid]
+            if idle:
+                logger.info(f"Evicted {len(idle)} idle chat session(s) from memory")
+
+            if session_id not in self.sessions:
+                self.sessions[session_id] = ChatSession(session_id, self.history_store)
+            return self.sessions[session_id]
 
     def _format_chat_history(self, messages: List[BaseMessage]) -> str:
         if not messages:
@@ -110,25 +116,88 @@ YOUR ANSWER:
 
         return "\n".join(formatted)
 
-    def ask(self, question: str) -> Tuple[str, List[BaseMessage]]:
-        """Generate an answer using RAG with memory."""
+    def _plan(
+        self,
+        question: str,
+        search_kwargs: Optional[Dict[str, Any]],
+        history: ChatSession
+    ) -> Tuple[str, Optional[Dict[str, str]], int]:
+        """
+        Retrieve context and choose how to answer.
+
+        Questions whose best chunk scores below RETRIEVAL_MIN_SCORE skip the
+        LLM entirely, unless the session has earlier turns to answer from;
+        short questions with a strong match go to the fast model when one
+        is configured.
 
-        try:
-            docs = self.retriever.invoke(question)
-            context = "\n\n".join([d.page_content for d in docs])
+        Returns:
+            Tuple[str, Optional[Dict[str, str]], int]: Route, prompt
+                variables (None when no LLM call is needed) and chunk count
+        """
+        docs, scores = self.retriever.invoke_with_scores(question, **(search_kwargs or {}))
+        top_score = scores[0] if docs else float("-inf")
+        recent = history.get_messages()[-settings.HISTORY_PROMPT_MESSAGES:]
+
+        # Follow-ups ("expand on the second point") match the documents poorly
+        # but can still be answered from the conversation
+        if top_score < settings.RETRIEVAL_MIN_SCORE and not recent:
+            logger.info("Route 'no_context': no sufficiently similar chunks")
+            return self.ROUTE_NO_CONTEXT, None, 0
+
+        route = self.ROUTE_FULL
+        if (self.fast_chain is not None
+                and top_score >= settings.FAST_ROUTE_MIN_SCORE
+                and len(question.split()) <= settings.FAST_ROUTE_MAX_WORDS):
+            route = self.ROUTE_FAST
+        logger.info(f"Route '{route}': {len(docs)} chunk(s), top score {top_score:.2f}")
+
+        inputs = {
+            "question": question,
+            "context": "\n\n".join([d.page_content for d in docs]),
+            "chat_history": self._format_chat_history(recent),
+        }
+        return route, inputs, len(docs)
 
-            response = self.chain.invoke(
-                {
-                    "question": question,
-                    "context": context,
-                    "chat_history": "",
-                },
-                config={"session_id": "default"},
-            )
+    def ask(
+        self,
+        question: str,
+        search_kwargs: Optional[Dict[str, Any]] = None,
+        session_id: str = "default"
+    ) -> Tuple[str, List[BaseMessage]]:
+        """
+        Generate an answer using RAG with memory.
 
-            answer = response.content
+        Args:
+            question: User question
+            search_kwargs: Retrieval options overriding the retriever defaults
+                for this question only (e.g. search_type, k, sources)
+            session_id: Conversation to answer in
+        """
+
+        try:
+            history = self._get_chat_history(session_id)
+            route, inputs, chunks = self._plan(question, search_kwargs, history)
+
+            if route == self.ROUTE_NO_CONTEXT:
+                answer = self.NOT_AVAILABLE_ANSWER
+                route_metrics.record(route)
+            else:
+                chain = self.fast_chain if route == self.ROUTE_FAST else self.chain
+                response = chain.invoke(inputs)
+                answer = response.content
+
+                # Coalesced answers reuse another caller's call and carry no usage
+                coalesced = bool(response.response_metadata.get("coalesced"))
+                usage = response.usage_metadata or {}
+                route_metrics.record(
+                    route,
+                    llm_called=not coalesced,
+                    coalesced=coalesced,
+                    context_chunks=0 if coalesced else chunks,
+                    input_tokens=usage.get("input_tokens", 0),
+                    output_tokens=usage.get("output_tokens", 0)
+                )
 
-            history = self.history_store["default"]
             history.add_messages([
                 HumanMessage(content=question),
                 AIMessage(content=answer)
@@ -142,7 +211,79 @@ YOUR ANSWER:
             logger.error(f"❌ RAGChain error: {str(e)}")
             raise
 
-    def clear_memory(self):
+    def stream(
+        self,
+        question: str,
+        search_kwargs: Optional[Dict[str, Any]] = None,
+        session_id: str = "default"
+    ) -> Iterator[str]:
+        """
+        Stream an answer as text chunks; the full turn is saved once complete.
+
+        Retrieval and routing run before this returns, so invalid
+        search_kwargs raise here rather than once iteration has started.
+
+        Args:
+            question: User question
+            search_kwargs: Retrieval options overriding the retriever defaults
+            session_id: Conversation to answer in
+
+        Returns:
+            Iterator[str]: Answer text chunks
+        """
+        try:
+            history = self._get_chat_history(session_id)
+            route, inputs, chunks = self._plan(question, search_kwargs, history)
+        except Exception as e:
+            logger.error(f"❌ RAGChain stream error: {str(e)}")
+            raise
+        return self._stream_answer(question, history, route, inputs, chunks)
+
+    def _stream_answer(
+        self,
+        question: str,
+        history: ChatSession,
+        route: str,
+        inputs: Optional[Dict[str, str]],
+        chunks: int
+    ) -> Iterator[str]:
+        try:
+            parts = []
+            if route == self.ROUTE_NO_CONTEXT:
+                parts.append(self.NOT_AVAILABLE_ANSWER)
+                yield self.NOT_AVAILABLE_ANSWER
+                route_metrics.record(route)
+            else:
+                llm = self.fast_llm if route == self.ROUTE_FAST else self.llm
+                prompt = self.prompt.invoke(inputs)
+                for text in llm.stream(prompt):
+                    parts.append(text)
+                    yield text
+
+                # Streamed responses carry no usage data, so estimate it
+                route_metrics.record(
+                    route,
+                    llm_called=True,
+                    context_chunks=chunks,
+                    input_tokens=estimate_tokens(prompt.to_messages()),
+                    output_tokens=estimate_tokens([AIMessage(content="".join(parts))])
+                )
+
+            history.add_messages([
+                HumanMessage(content=question),
+                AIMessage(content="".join(parts))
+            ])
+            logger.info(f"✓ RAG answer streamed for: {question[:50]}...")
+
+        except Exception as e:
+            logger.error(f"❌ RAGChain stream error: {str(e)}")
+            raise
+
+    def get_history(self, session_id: str = "default") -> List[BaseMessage]:
+        """Recent messages of a session, e.g. to resume it after a restart."""
+        return self._get_chat_history(session_id).get_messages()
+
+    def clear_memory(self, session_id: str = "default"):
         """Reset conversation memory."""
-        self.history_store["default"].clear()
+        self._get_chat_history(session_id).clear()
         logger.info("✓ Chat history cleared")
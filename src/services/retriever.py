@@ -0,0 +1,319 @@
+"""
+Retriever service with similarity, MMR and metadata-filtered search modes.
+"""
+import os
+from dataclasses import dataclass, replace
+from typing import List, Optional, Tuple
+
+import numpy as np
+from langchain_community.vectorstores import FAISS
+from langchain_core.documents import Document
+
+from config.settings import settings
+from src.utils.logger import logger
+
+
+SEARCH_TYPES = ("similarity", "mmr")
+
+
+@dataclass
+class RetrievalConfig:
+    """Retrieval options that can be overridden per question."""
+
+    search_type: str = settings.RETRIEVAL_SEARCH_TYPE
+    k: int = settings.RETRIEVAL_K
+    fetch_k: int = settings.RETRIEVAL_FETCH_K
+    lambda_mult: float = settings.RETRIEVAL_MMR_LAMBDA
+    max_per_source: int = settings.RETRIEVAL_MAX_PER_SOURCE
+    sources: Optional[List[str]] = None
+    page_range: Optional[Tuple[int, int]] = None
+    adaptive_k: bool = settings.RETRIEVAL_ADAPTIVE_K
+    min_k: int = settings.RETRIEVAL_MIN_K
+    score_gap: float = settings.RETRIEVAL_SCORE_GAP
+
+    def validate(self) -> None:
+        """Validate retrieval options."""
+        if self.search_type not in SEARCH_TYPES:
+            raise ValueError(
+                f"Unknown search_type '{self.search_type}', expected one of {SEARCH_TYPES}"
+            )
+        if self.k < 1 or self.min_k < 1:
+            raise ValueError("k and min_k must be at least 1")
+        if not 0.0 <= self.lambda_mult <= 1.0:
+            raise ValueError("lambda_mult must be between 0 and 1")
+        if self.page_range and self.page_range[0] > self.page_range[1]:
+            raise ValueError("page_range start must not exceed its end")
+
+
+def _adaptive_k(sorted_scores: np.ndarray, min_k: int, score_gap: float) -> int:
+    """
+    Pick k at the first large drop in similarity.
+
+    Args:
+        sorted_scores: Top candidate scores in descending order, at most k of them
+        min_k: Minimum number of documents to keep
+        score_gap: Score drop between neighbours that ends the selection
+
+    Returns:
+        int: Number of documents to keep
+    """
+    if len(sorted_scores) <= min_k:
+        return len(sorted_scores)
+    gaps = sorted_scores[:-1] - sorted_scores[1:]
+    cut = np.nonzero(gaps[min_k - 1:] >= score_gap)[0]
+    return int(min_k + cut[0]) if cut.size else len(sorted_scores)
+
+
+def _mmr_select(
+    vectors: np.ndarray,
+    relevance: np.ndarray,
+    source_ids: np.ndarray,
+    k: int,
+    lambda_mult: float,
+    max_per_source: int
+) -> List[int]:
+    """
+    Greedy maximal-marginal-relevance selection over a candidate matrix.
+
+    Each step scores every remaining candidate at once; with
+    ``lambda_mult=1`` this degrades to plain top-k by relevance, which lets
+    the per-source quota share the same code path.
+
+    Args:
+        vectors: Normalized candidate embeddings, one row per candidate
+        relevance: Cosine similarity of each candidate to the query
+        source_ids: Integer source id of each candidate
+        k: Number of candidates to select
+        lambda_mult: Trade-off between relevance (1) and diversity (0)
+        max_per_source: Maximum selections per source, 0 for no quota
+
+    Returns:
+        List[int]: Selected row positions in selection order
+    """
+    n = len(relevance)
+    available = np.ones(n, dtype=bool)
+    redundancy = np.zeros(n, dtype=np.float32)
+    source_counts = np.zeros(int(source_ids.max()) + 1 if n else 0, dtype=np.int64)
+    selected: List[int] = []
+
+    for step in range(min(k, n)):
+        if max_per_source > 0:
+            available &= source_counts[source_ids] < max_per_source
+        score = lambda_mult * relevance - (1.0 - lambda_mult) * redundancy
+        score = np.where(available, score, -np.inf)
+
+        best = int(np.argmax(score))
+        if not np.isfinite(score[best]):
+            break
+
+        selected.append(best)
+        available[best] = False
+        source_counts[source_ids[best]] += 1
+
+        if lambda_mult < 1.0:
+            similarity = vectors @ vectors[best]
+            redundancy = similarity if step == 0 else np.maximum(redundancy, similarity)
+
+    return selected
+
+
+def _top_per_source(
+    candidates: np.ndarray,
+    scores: np.ndarray,
+    source_ids: np.ndarray,
+    limit: int
+) -> np.ndarray:
+    """
+    Keep the best-scoring candidates of every source.
+
+    Args:
+        candidates: Row indices to choose from
+        scores: Similarity score per row
+        source_ids: Source index per row
+        limit: Candidates kept per source
+
+    Returns:
+        np.ndarray: Kept row indices, best score first
+    """
+    order = candidates[np.argsort(-scores[candidates], kind="stable")]
+    sources = source_ids[order]
+    # A stable sort by source keeps each source's rows best-first
+    by_source = np.argsort(sources, kind="stable")
+    grouped = sources[by_source]
+    rank = np.empty(len(order), dtype=np.int64)
+    rank[by_source] = np.arange(len(order)) - np.searchsorted(grouped, grouped)
+    return order[rank < limit]
+
+
+class VectorRetriever:
+    """Score a FAISS index with NumPy and apply retrieval modes per query."""
+
+    def __init__(
+        self,
+        vectorstore: FAISS,
+        embeddings,
+        config: Optional[RetrievalConfig] = None
+    ):
+        """
+        Initialize retriever.
+
+        Args:
+            vectorstore: FAISS vector store to search
+            embeddings: Embedding model used for queries
+            config: Default retrieval options
+        """
+        self.vectorstore = vectorstore
+        self.embeddings = embeddings
+        self.config = config or RetrievalConfig()
+        self.config.validate()
+
+        self._size = -1
+        self._source = None
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Rebuild the candidate matrix and metadata arrays if the index changed."""
+        index = self.vectorstore.index
+        size = index.ntotal
+        # Holding the objects (not their ids) keeps a replaced index from
+        # passing as unchanged just because it has the same number of vectors
+        source = (self.vectorstore, index, self.vectorstore.docstore)
+        if size == self._size and self._source is not None and all(
+            a is b for a, b in zip(source, self._source)
+        ):
+            return
+
+        vectors = index.reconstruct_n(0, size).astype(np.float32) if size else \
+            np.zeros((0, index.d), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self._matrix = vectors / np.maximum(norms, 1e-12)
+
+        self._docs: List[Document] = [
+            self.vectorstore.docstore.search(self.vectorstore.index_to_docstore_id[i])
+            for i in range(size)
+        ]
+        source_names = [
+            os.path.basename(str(doc.metadata.get("source", ""))) for doc in self._docs
+        ]
+        self._source_names, self._source_ids = np.unique(
+            np.array(source_names, dtype=str), return_inverse=True
+        )
+        self._pages = np.array(
+            [int(doc.metadata.get("page", -1)) for doc in self._docs], dtype=np.int64
+        )
+        self._size = size
+        self._source = source
+        logger.info(f"Retriever indexed {size} chunks from {len(self._source_names)} source(s)")
+
+    @property
+    def sources(self) -> List[str]:
+        """Names of the source files present in the index."""
+        self._refresh()
+        return [str(name) for name in self._source_names]
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Embed and normalize a query."""
+        vector = np.asarray(self.embeddings.embed_query(query), dtype=np.float32)
+        return vector / max(float(np.linalg.norm(vector)), 1e-12)
+
+    def _filter_mask(self, config: RetrievalConfig) -> np.ndarray:
+        """Boolean mask of chunks passing the metadata filters."""
+        mask = np.ones(self._size, dtype=bool)
+        if config.sources:
+            wanted = np.isin(
+                self._source_names, [os.path.basename(s) for s in config.sources]
+            )
+            mask &= wanted[self._source_ids]
+        if config.page_range:
+            first, last = config.page_range
+            # Page metadata is 0-based; page_range uses 1-based page numbers
+            mask &= (self._pages >= first - 1) & (self._pages <= last - 1)
+        return mask
+
+    def search(
+        self,
+        query: str,
+        config: Optional[RetrievalConfig] = None
+    ) -> Tuple[List[Document], List[float]]:
+        """
+        Retrieve documents and their cosine similarity to the query.
+
+        Args:
+            query: User question
+            config: Retrieval options, defaults to the retriever's config
+
+        Returns:
+            Tuple[List[Document], List[float]]: Documents and similarity scores
+        """
+        config = config or self.config
+        config.validate()
+        self._refresh()
+
+        mask = self._filter_mask(config)
+        n_valid = int(mask.sum())
+        if n_valid == 0:
+            return [], []
+
+        scores = np.where(mask, self._matrix @ self._embed_query(query), -np.inf)
+
+        fetch_k = min(max(config.fetch_k, config.k), n_valid)
+        if config.max_per_source > 0:
+            # Fetch per source, otherwise one long PDF can fill every candidate slot
+            candidates = _top_per_source(
+                np.flatnonzero(mask), scores, self._source_ids, fetch_k
+            )
+        else:
+            candidates = np.argpartition(-scores, fetch_k - 1)[:fetch_k]
+            candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+
+        k = config.k
+        if config.adaptive_k:
+            k = _adaptive_k(scores[candidates[:config.k]], config.min_k, config.score_gap)
+
+        if config.search_type == "similarity" and config.max_per_source <= 0:
+            chosen = candidates[:k]
+        else:
+            lambda_mult = config.lambda_mult if config.search_type == "mmr" else 1.0
+            picks = _mmr_select(
+                self._matrix[candidates],
+                scores[candidates],
+                self._source_ids[candidates],
+                k,
+                lambda_mult,
+                config.max_per_source
+            )
+            chosen = candidates[picks]
+
+        return [self._docs[i] for i in chosen], [float(scores[i]) for i in chosen]
+
+    def invoke_with_scores(
+        self,
+        query: str,
+        **overrides
+    ) -> Tuple[List[Document], List[float]]:
+        """
+        Retrieve documents and their similarity scores for a query.
+
+        Args:
+            query: User question
+            **overrides: RetrievalConfig fields to override for this query
+
+        Returns:
+            Tuple[List[Document], List[float]]: Documents and similarity scores
+        """
+        config = replace(self.config, **overrides) if overrides else self.config
+        return self.search(query, config)
+
+    def invoke(self, query: str, **overrides) -> List[Document]:
+        """
+        Retrieve documents for a query.
+
+        Args:
+            query: User question
+            **overrides: RetrievalConfig fields to override for this query
+
+        Returns:
+            List[Document]: Retrieved documents
+        """
+        docs, _ = self.invoke_with_scores(query, **overrides)
+        return docs
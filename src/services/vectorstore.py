@@ -1,30 +1,39 @@
 """
 Vector store service for document embeddings and retrieval.
 """
+import os
+import shutil
+import tempfile
 from typing import List
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 
 from config.settings import settings
+from src.services.query_encoder import QueryEncoder
+from src.services.retriever import RetrievalConfig, VectorRetriever
 from src.utils.logger import logger
 
 
 class VectorStoreService:
     """Manage vector store operations."""
     
-    def __init__(self, model_name: str = settings.EMBEDDING_MODEL):
+    def __init__(self, model_name: str = settings.EMBEDDING_MODEL, embeddings=None):
         """
         Initialize vector store service.
         
         Args:
             model_name: Name of the embedding model
+            embeddings: Embedding model to use instead of loading model_name
         """
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=model_name,
-            model_kwargs={"device": "cpu"}
-        )
-        logger.info(f"Loaded embedding model: {model_name.split('/')[-1]}")
+        if embeddings is None:
+            embeddings = HuggingFaceEmbeddings(
+                model_name=model_name,
+                model_kwargs={"device": "cpu"}
+            )
+            logger.info(f"Loaded embedding model: {model_name.split('/')[-1]}")
+        self.embeddings = embeddings
+        self.query_encoder = QueryEncoder(self.embeddings)
     
     def create_vectorstore(self, chunks: List[Document]) -> FAISS:
         """
@@ -47,15 +56,88 @@ class VectorStoreService:
             logger.error(f"Error creating vector store: {str(e)}")
             raise
     
-    def get_retriever(self, vectorstore: FAISS, k: int = 4):
+    def add_documents(self, vectorstore: FAISS, chunks: List[Document]) -> FAISS:
+        """
+        Add document chunks to an existing vector store.
+        
+        Args:
+            vectorstore: FAISS vector store
+            chunks: List of document chunks
+            
+        Returns:
+            FAISS: The updated vector store
+        """
+        try:
+            vectorstore.add_documents(chunks)
+            logger.info(f"Added {len(chunks)} chunks to vector store")
+            return vectorstore
+        except Exception as e:
+            logger.error(f"Error adding to vector store: {str(e)}")
+            raise
+    
+    def save_vectorstore(self, vectorstore: FAISS, index_dir: str) -> None:
+        """
+        Persist vector store to a directory.
+        
+        Files are written to a staging directory first and then moved into
+        place, so readers never see a partially written file.
+        
+        Args:
+            vectorstore: FAISS vector store
+            index_dir: Target directory
+        """
+        staging = tempfile.mkdtemp(dir=index_dir, prefix=".staging-")
+        try:
+            vectorstore.save_local(staging)
+            for name in os.listdir(staging):
+                os.replace(os.path.join(staging, name), os.path.join(index_dir, name))
+            logger.info(f"Vector store saved to {index_dir}")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+    
+    def load_vectorstore(self, index_dir: str) -> FAISS:
+        """
+        Load a vector store persisted with save_vectorstore.
+        
+        Args:
+            index_dir: Directory containing the index
+            
+        Returns:
+            FAISS: Vector store instance
+        """
+        try:
+            # The pickle is only ever written by this application
+            vectorstore = FAISS.load_local(
+                index_dir,
+                self.embeddings,
+                allow_dangerous_deserialization=True
+            )
+            logger.info(f"Vector store loaded from {index_dir}")
+            return vectorstore
+        except Exception as e:
+            logger.error(f"Error loading vector store: {str(e)}")
+            raise
+    
+    def get_retriever(
+        self,
+        vectorstore: FAISS,
+        k: int = settings.RETRIEVAL_K,
+        **options
+    ) -> VectorRetriever:
         """
         Get retriever from vector store.
         
         Args:
             vectorstore: FAISS vector store
             k: Number of documents to retrieve
+            **options: Additional RetrievalConfig fields (search_type,
+                fetch_k, lambda_mult, max_per_source, sources, page_range)
             
         Returns:
-            Retriever instance
+            VectorRetriever: Retriever instance
         """
-        return vectorstore.as_retriever(search_kwargs={"k": k})
\ No newline at end of file
+        return VectorRetriever(
+            vectorstore,
+            self.query_encoder,
+            RetrievalConfig(k=k, **options)
+        )
@@ -2,38 +2,127 @@
 Reusable UI components for the Streamlit application.
 """
 import streamlit as st
-from typing import List
+from typing import Any, Callable, Dict, List, Optional, Tuple
 from langchain_core.messages import BaseMessage
 
+from config.settings import settings
+from src.services.retriever import SEARCH_TYPES
 from src.ui.templates import USER_TEMPLATE, BOT_TEMPLATE
 
 
-def render_message(message: BaseMessage, index: int) -> None:
+def render_message_html(message: BaseMessage) -> str:
     """
-    Render a single chat message.
+    Build the HTML for a single chat message.
     
     Args:
         message: Message to render
-        index: Message index in history
+        
+    Returns:
+        str: Message HTML
+    """
+    template = USER_TEMPLATE if message.type == "human" else BOT_TEMPLATE
+    return template.replace("{{MSG}}", message.content)
+
+
+def update_rendered_history(
+    cache: List[Tuple[Optional[str], str]],
+    history: List[BaseMessage],
+    earlier: Optional[List[Tuple[Optional[str], str]]] = None
+) -> List[Tuple[Optional[str], str]]:
     """
-    is_user = index % 2 == 0
-    template = USER_TEMPLATE if is_user else BOT_TEMPLATE
+    Render only the messages that are not in the cache yet.
     
-    st.write(
-        template.replace("{{MSG}}", message.content),
-        unsafe_allow_html=True
-    )
+    Finished messages never change, so each one is rendered exactly once.
+    Entries are keyed on the message id the history store assigns: the
+    history is a sliding window, so its length stops growing once the
+    window is full and cannot tell new messages apart from old ones.
+    
+    Args:
+        cache: Previously rendered (message id, HTML) pairs, updated in place
+        history: Current list of chat messages
+        earlier: Older pages loaded from the history store; while it is
+            non-empty, entries that slide out of the window move to its end
+            so it stays contiguous with the cache. Cleared with the cache.
+        
+    Returns:
+        List[Tuple[Optional[str], str]]: (message id, HTML) per message in history
+    """
+    ids = [message.id for message in history]
+    last_id = cache[-1][0] if cache else None
+    
+    if last_id is not None and last_id in ids:
+        start = ids.index(last_id) + 1
+        # Drop messages that slid out of the window, keep the rest
+        slid_out = len(cache) - start
+        if earlier:
+            earlier.extend(cache[:slid_out])
+        del cache[:slid_out]
+    elif last_id is None and cache and len(cache) <= len(history) and not any(ids):
+        # Messages without ids (not persisted yet): fall back to the length
+        start = len(cache)
+    else:
+        cache.clear()
+        if earlier is not None:
+            earlier.clear()
+        start = 0
+    
+    for message in history[start:]:
+        cache.append((message.id, render_message_html(message)))
+    return cache
+
 
+def reset_rendered_history() -> None:
+    """Drop cached message HTML and pagination, e.g. after clearing the chat."""
+    st.session_state.rendered_messages = []
+    st.session_state.earlier_messages = []
+    st.session_state.history_exhausted = False
+    st.session_state.history_pages = 1
 
-def render_chat_history(history: List[BaseMessage]) -> None:
+
+def render_chat_history(
+    history: List[BaseMessage],
+    page_size: int = settings.CHAT_PAGE_SIZE,
+    load_earlier: Optional[Callable[[str, int], List[BaseMessage]]] = None
+) -> None:
     """
-    Render complete chat history.
+    Render the most recent page(s) of chat history.
+    
+    Pages beyond the in-memory history window are fetched on demand.
     
     Args:
-        history: List of chat messages
+        history: Recent chat messages
+        page_size: Number of messages per page
+        load_earlier: Loads up to the given number of messages older than a
+            message id from the history store; None when history holds the
+            whole conversation
     """
-    for i, message in enumerate(history):
-        render_message(message, i)
+    if "rendered_messages" not in st.session_state:
+        reset_rendered_history()
+    
+    earlier = st.session_state.earlier_messages
+    cache = update_rendered_history(st.session_state.rendered_messages, history, earlier)
+    rendered = earlier + cache
+    
+    visible = page_size * st.session_state.history_pages
+    hidden = max(0, len(rendered) - visible)
+    can_load = load_earlier is not None and not st.session_state.history_exhausted
+    if hidden or can_load:
+        label = "Show earlier messages" + ("" if can_load else f" ({hidden})")
+        if st.button(label, key="show_earlier"):
+            if can_load and hidden <= page_size and rendered and rendered[0][0]:
+                # One extra message tells whether anything older is left
+                older = load_earlier(rendered[0][0], page_size + 1)
+                earlier[:0] = [(m.id, render_message_html(m)) for m in older]
+                st.session_state.history_exhausted = len(older) <= page_size
+            st.session_state.history_pages += 1
+            st.rerun()
+    
+    st.markdown(
+        '<div class="chat-container">'
+        + "".join(html for _, html in rendered[hidden:])
+        + "</div>",
+        unsafe_allow_html=True
+    )
 
 
 def render_sidebar_upload() -> List:
@@ -86,4 +175,59 @@ def render_clear_button() -> bool:
         return st.button(
             "Clear Chat History",
             use_container_width=True
-        )
\ No newline at end of file
+        )
+
+
+def render_retrieval_settings(sources: List[str]) -> Dict[str, Any]:
+    """
+    Render retrieval options in sidebar.
+    
+    Args:
+        sources: Names of the indexed PDF files
+        
+    Returns:
+        Dict[str, Any]: Retrieval overrides for the next question
+    """
+    with st.sidebar:
+        with st.expander("Retrieval Settings"):
+            search_type = st.selectbox(
+                "Search mode",
+                SEARCH_TYPES,
+                index=SEARCH_TYPES.index(settings.RETRIEVAL_SEARCH_TYPE),
+                help="MMR trades some relevance for more diverse chunks"
+            )
+            k = st.slider("Chunks to retrieve", 1, 10, settings.RETRIEVAL_K)
+            adaptive_k = st.checkbox(
+                "Adaptive chunk count",
+                value=settings.RETRIEVAL_ADAPTIVE_K,
+                help="Stop early at a large drop in similarity score"
+            )
+            max_per_source = st.number_input(
+                "Max chunks per PDF (0 = no limit)",
+                min_value=0,
+                max_value=10,
+                value=settings.RETRIEVAL_MAX_PER_SOURCE
+            )
+            selected_sources = st.multiselect(
+                "Only search these PDFs",
+                sources,
+                help="Leave empty to search all documents"
+            )
+            
+            page_range = None
+            if st.checkbox("Limit page range"):
+                col1, col2 = st.columns(2)
+                with col1:
+                    first = st.number_input("From page", min_value=1, value=1)
+                with col2:
+                    last = st.number_input("To page", min_value=1, value=max(first, 1))
+                page_range = (int(first), int(max(first, last)))
+    
+    return {
+        "search_type": search_type,
+        "k": k,
+        "adaptive_k": adaptive_k,
+        "max_per_source": int(max_per_source),
+        "sources": selected_sources or None,
+        "page_range": page_range,
+    }
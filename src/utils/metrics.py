@@ -0,0 +1,104 @@
+"""
+Per-route answer metrics for verifying LLM token savings.
+"""
+import threading
+from typing import Dict
+
+ROUTES = ("full", "fast", "no_context")
+
+FIELDS = {
+    "requests": "Questions answered per route",
+    "llm_calls": "LLM calls made per route",
+    "coalesced": "Answers shared from an identical in-flight LLM call per route",
+    "context_chunks": "Document chunks sent to the LLM per route",
+    "input_tokens": "LLM prompt tokens per route",
+    "output_tokens": "LLM completion tokens per route",
+}
+
+
+class RouteMetrics:
+    """Thread-safe counters keyed by answer route."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, int]] = {
+            route: dict.fromkeys(FIELDS, 0) for route in ROUTES
+        }
+
+    def record(
+        self,
+        route: str,
+        llm_called: bool = False,
+        coalesced: bool = False,
+        context_chunks: int = 0,
+        input_tokens: int = 0,
+        output_tokens: int = 0
+    ) -> None:
+        """
+        Record one answered question.
+
+        Args:
+            route: Route that produced the answer
+            llm_called: Whether an LLM call was made
+            coalesced: Whether the answer came from another caller's LLM call
+            context_chunks: Chunks included in the prompt
+            input_tokens: Prompt tokens used
+            output_tokens: Completion tokens used
+        """
+        with self._lock:
+            counters = self._counters.setdefault(route, dict.fromkeys(FIELDS, 0))
+            counters["requests"] += 1
+            counters["llm_calls"] += int(llm_called)
+            counters["coalesced"] += int(coalesced)
+            counters["context_chunks"] += context_chunks
+            counters["input_tokens"] += input_tokens
+            counters["output_tokens"] += output_tokens
+
+    def snapshot(self) -> Dict[str, Dict[str, int]]:
+        """
+        Get a copy of all counters.
+
+        Returns:
+            Dict[str, Dict[str, int]]: Counters by route, then by field
+        """
+        with self._lock:
+            return {route: dict(counters) for route, counters in self._counters.items()}
+
+    def to_prometheus(self) -> str:
+        """
+        Render counters in the Prometheus text exposition format.
+
+        Returns:
+            str: Metrics text
+        """
+        snapshot = self.snapshot()
+        lines = []
+        for field, help_text in FIELDS.items():
+            name = f"rag_route_{field}_total"
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} counter")
+            for route, counters in snapshot.items():
+                lines.append(f'{name}{{route="{route}"}} {counters[field]}')
+        return "\n".join(lines) + "\n"
+
+
+def query_cache_to_prometheus(stats: Dict[str, int]) -> str:
+    """
+    Render query embedding cache counters in the Prometheus text format.
+
+    Args:
+        stats: Counters from QueryEncoder.stats()
+
+    Returns:
+        str: Metrics text
+    """
+    lines = []
+    for field, count in stats.items():
+        name = f"rag_query_cache_{field}_total"
+        lines.append(f"# HELP {name} Query embedding cache {field}")
+        lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name} {count}")
+    return "\n".join(lines) + "\n"
+
+
+route_metrics = RouteMetrics()
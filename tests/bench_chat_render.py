@@ -0,0 +1,75 @@
+"""
+Benchmark Streamlit rerun time of the chat history against conversation length.
+
+Run from the repository root:
+
+    python tests/bench_chat_render.py [--reruns 20] [--turns 10 100 1000] 2>/dev/null
+
+Each case renders a conversation of N turns with ``render_chat_history`` inside
+an AppTest script and times the reruns that follow the first render. The
+``full`` column re-emits every message with its own ``st.write`` on each rerun,
+as the app did before rendering was cached and paginated.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from streamlit.testing.v1 import AppTest
+
+
+def chat_app():
+    import streamlit as st
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    from src.ui.components import render_chat_history, render_message_html
+
+    if "chat_history" not in st.session_state:
+        history = []
+        for i in range(st.session_state.turns):
+            history.append(HumanMessage(content=f"Question {i} " + "lorem ipsum " * 10, id=str(2 * i)))
+            history.append(AIMessage(content=f"Answer {i} " + "dolor sit amet " * 40, id=str(2 * i + 1)))
+        st.session_state.chat_history = history
+
+    st.text_input("Ask a question")
+    if st.session_state.cached:
+        render_chat_history(st.session_state.chat_history)
+    else:
+        for message in st.session_state.chat_history:
+            st.write(render_message_html(message), unsafe_allow_html=True)
+
+
+def time_reruns(turns: int, cached: bool, reruns: int) -> float:
+    """Median rerun time in milliseconds."""
+    app = AppTest.from_function(chat_app, default_timeout=60)
+    app.session_state.turns = turns
+    app.session_state.cached = cached
+    app.run()
+
+    timings = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        app.run()
+        timings.append((time.perf_counter() - start) * 1000)
+    assert not app.exception
+    return statistics.median(timings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--turns", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'turns':>8} {'cached ms':>12} {'full ms':>12}")
+    for turns in args.turns:
+        cached = time_reruns(turns, True, args.reruns)
+        full = time_reruns(turns, False, args.reruns)
+        print(f"{turns:>8} {cached:>12.1f} {full:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
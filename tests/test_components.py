@@ -0,0 +1,117 @@
+"""
+Tests for incremental chat history rendering.
+"""
+from langchain_core.messages import AIMessage, HumanMessage
+from streamlit.testing.v1 import AppTest
+
+from src.services.history_store import ChatSession, InMemoryHistoryStore
+from src.ui import components
+from src.ui.components import update_rendered_history
+
+
+def turn(i):
+    return [HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")]
+
+
+def test_new_messages_are_appended_and_rendered_once(monkeypatch):
+    rendered = []
+    render = components.render_message_html
+    monkeypatch.setattr(components, "render_message_html", lambda m: rendered.append(m.content) or render(m))
+    session = ChatSession("s1", InMemoryHistoryStore())
+    cache = []
+
+    session.add_messages(turn(0))
+    update_rendered_history(cache, session.get_messages())
+    session.add_messages(turn(1))
+    update_rendered_history(cache, session.get_messages())
+    update_rendered_history(cache, session.get_messages())
+
+    assert rendered == ["q0", "a0", "q1", "a1"]
+    assert [message_id for message_id, _ in cache] == [m.id for m in session.get_messages()]
+
+
+def test_window_capped_history_keeps_rendering_new_turns():
+    session = ChatSession("s1", InMemoryHistoryStore(), window=4)
+    cache = []
+
+    for i in range(5):
+        session.add_messages(turn(i))
+        update_rendered_history(cache, session.get_messages())
+
+    assert len(cache) == 4
+    assert "q4" in cache[-2][1] and "a4" in cache[-1][1]
+    assert [message_id for message_id, _ in cache] == [m.id for m in session.get_messages()]
+
+
+def test_cleared_history_resets_cache():
+    session = ChatSession("s1", InMemoryHistoryStore())
+    cache = []
+    session.add_messages(turn(0))
+    update_rendered_history(cache, session.get_messages())
+
+    session.clear()
+    assert update_rendered_history(cache, session.get_messages()) == []
+
+    session.add_messages(turn(1))
+    assert "q1" in update_rendered_history(cache, session.get_messages())[0][1]
+
+
+def test_messages_without_ids_fall_back_to_length():
+    history = turn(0)
+    cache = update_rendered_history([], history)
+
+    history += turn(1)
+    update_rendered_history(cache, history)
+
+    assert len(cache) == 4
+    assert "a1" in cache[-1][1]
+
+
+def test_messages_sliding_out_of_window_join_loaded_pages():
+    session = ChatSession("s1", InMemoryHistoryStore(), window=4)
+    for i in range(2):
+        session.add_messages(turn(i))
+    cache = update_rendered_history([], session.get_messages())
+    earlier = [("0", "older page")]
+
+    session.add_messages(turn(2))
+    update_rendered_history(cache, session.get_messages(), earlier)
+
+    assert [message_id for message_id, _ in earlier] == ["0", "1", "2"]
+    assert "q2" in cache[-2][1]
+
+
+def paged_chat_app():
+    from functools import partial
+
+    import streamlit as st
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    from src.services.history_store import ChatSession, InMemoryHistoryStore
+    from src.ui.components import render_chat_history
+
+    if "session" not in st.session_state:
+        st.session_state.session = ChatSession("s1", InMemoryHistoryStore(), window=4)
+        for i in range(5):
+            st.session_state.session.add_messages([
+                HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")
+            ])
+    session = st.session_state.session
+    render_chat_history(
+        session.get_messages(),
+        page_size=2,
+        load_earlier=partial(session.store.load_before, "s1")
+    )
+
+
+def test_show_earlier_pages_back_to_the_first_stored_message():
+    app = AppTest.from_function(paged_chat_app, default_timeout=30)
+    app.run()
+    assert "q4" in app.markdown[0].value and "q3" not in app.markdown[0].value
+
+    for _ in range(4):
+        app.button(key="show_earlier").click().run()
+
+    shown = app.markdown[0].value
+    assert all(f"q{i}" in shown and f"a{i}" in shown for i in range(5))
+    assert len(app.button) == 0
@@ -0,0 +1,103 @@
+"""
+Tests for several engines sharing one on-disk index, as REST workers do.
+"""
+import hashlib
+import os
+import threading
+from typing import List
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from src.services.engine import RAGEngine
+from src.services.vectorstore import VectorStoreService
+
+
+class HashEmbeddings(Embeddings):
+    """Deterministic 8-dimensional embeddings derived from the text hash."""
+
+    def _embed(self, text: str) -> List[float]:
+        digest = hashlib.sha256(text.encode()).digest()
+        return [b / 255.0 + 0.01 for b in digest[:8]]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+
+class StubPDFProcessor:
+    """Turns every path into two chunks instead of parsing a PDF."""
+
+    def process_paths(self, paths: List[str]) -> List[Document]:
+        return [
+            Document(page_content=f"{path} chunk {i}", metadata={"source": path, "page": i})
+            for path in paths
+            for i in range(2)
+        ]
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    index_dir = str(tmp_path / "index")
+
+    def make() -> RAGEngine:
+        service = VectorStoreService(embeddings=HashEmbeddings())
+        # Encode queries directly; batching is covered by the query encoder tests
+        service.query_encoder.batch_window = 0
+        return RAGEngine(index_dir, vectorstore_service=service, pdf_processor=StubPDFProcessor())
+
+    return make
+
+
+def chunk_count(engine: RAGEngine) -> int:
+    return engine.vectorstore.index.ntotal
+
+
+def test_engine_sees_index_written_by_another_engine(make_engine):
+    writer, reader = make_engine(), make_engine()
+    assert not reader.ready
+
+    writer.ingest_paths(["/docs/a.pdf"])
+
+    assert reader.ready
+    assert reader.sources == ["a.pdf"]
+    assert not reader.refresh()
+
+
+def test_ingest_merges_into_index_written_by_another_engine(make_engine):
+    first, second = make_engine(), make_engine()
+    first.ingest_paths(["/docs/a.pdf"])
+
+    # second has not refreshed since first wrote the index
+    second.ingest_paths(["/docs/b.pdf"])
+
+    assert second.sources == ["a.pdf", "b.pdf"]
+    assert first.sources == ["a.pdf", "b.pdf"]
+    assert chunk_count(first) == chunk_count(second) == 4
+    assert make_engine().sources == ["a.pdf", "b.pdf"]
+
+
+def test_concurrent_ingests_lose_no_chunks(make_engine):
+    engines = [make_engine(), make_engine()]
+
+    def ingest(engine, prefix):
+        for i in range(3):
+            engine.ingest_paths([f"/docs/{prefix}{i}.pdf"])
+
+    threads = [
+        threading.Thread(target=ingest, args=(engine, prefix))
+        for engine, prefix in zip(engines, "ab")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    fresh = make_engine()
+    assert fresh.ready
+    assert chunk_count(fresh) == 12
+    assert fresh.sources == sorted(f"{p}{i}.pdf" for p in "ab" for i in range(3))
+    assert not any(name.startswith(".staging-") for name in os.listdir(fresh.index_dir))
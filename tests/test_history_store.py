@@ -0,0 +1,107 @@
+"""
+Tests for conversation history backends and chat sessions.
+"""
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.services.history_store import ChatSession, InMemoryHistoryStore, SQLiteHistoryStore
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryHistoryStore()
+    return SQLiteHistoryStore(str(tmp_path / "history.db"))
+
+
+def turn(i):
+    return [HumanMessage(content=f"q{i}"), AIMessage(content=f"a{i}")]
+
+
+def contents(messages):
+    return [m.content for m in messages]
+
+
+def test_first_turn_of_fresh_session_is_not_duplicated(store):
+    session = ChatSession("s1", store)
+    session.add_messages(turn(0))
+
+    assert contents(session.get_messages()) == ["q0", "a0"]
+    assert contents(store.load_recent("s1", 10)) == ["q0", "a0"]
+
+
+def test_resumed_session_appends_once(store):
+    ChatSession("s1", store).add_messages(turn(0))
+
+    resumed = ChatSession("s1", store)
+    resumed.add_messages(turn(1))
+
+    assert contents(resumed.get_messages()) == ["q0", "a0", "q1", "a1"]
+
+
+def test_window_keeps_most_recent_messages(store):
+    session = ChatSession("s1", store, window=4)
+    for i in range(3):
+        session.add_messages(turn(i))
+
+    assert contents(session.get_messages()) == ["q1", "a1", "q2", "a2"]
+    assert contents(ChatSession("s1", store, window=4).get_messages()) == ["q1", "a1", "q2", "a2"]
+
+
+def test_sessions_are_isolated_and_clearable(store):
+    ChatSession("s1", store).add_messages(turn(0))
+    other = ChatSession("s2", store)
+    other.add_messages(turn(1))
+
+    other.clear()
+
+    assert contents(store.load_recent("s1", 10)) == ["q0", "a0"]
+    assert store.load_recent("s2", 10) == []
+    assert other.get_messages() == []
+
+
+def test_message_types_round_trip(store):
+    ChatSession("s1", store).add_messages(turn(0))
+
+    loaded = store.load_recent("s1", 10)
+
+    assert isinstance(loaded[0], HumanMessage)
+    assert isinstance(loaded[1], AIMessage)
+
+
+def test_messages_get_increasing_row_ids(store):
+    first, second = turn(0), turn(1)
+    session = ChatSession("s1", store)
+    session.add_messages(first)
+    session.add_messages(second)
+
+    ids = [int(m.id) for m in first + second]
+    assert ids == sorted(ids) and len(set(ids)) == 4
+    assert [m.id for m in store.load_recent("s1", 10)] == [m.id for m in first + second]
+
+
+def test_workers_sharing_a_database_see_each_others_turns(tmp_path):
+    db_path = str(tmp_path / "history.db")
+    worker_a = ChatSession("s1", SQLiteHistoryStore(db_path))
+    worker_b = ChatSession("s1", SQLiteHistoryStore(db_path))
+
+    worker_a.add_messages(turn(0))
+    assert contents(worker_b.get_messages()) == ["q0", "a0"]
+
+    worker_b.add_messages(turn(1))
+    assert contents(worker_a.get_messages()) == ["q0", "a0", "q1", "a1"]
+
+    worker_b.clear()
+    assert worker_a.get_messages() == []
+
+
+def test_load_before_pages_back_through_stored_messages(store):
+    session = ChatSession("s1", store, window=2)
+    for i in range(4):
+        session.add_messages(turn(i))
+    oldest_in_window = session.get_messages()[0].id
+
+    page = store.load_before("s1", oldest_in_window, 3)
+    assert contents(page) == ["a1", "q2", "a2"]
+    assert contents(store.load_before("s1", page[0].id, 3)) == ["q0", "a0", "q1"]
+    assert store.load_before("s1", store.load_recent("s1", 10)[0].id, 3) == []
@@ -0,0 +1,219 @@
+"""
+Tests for the LLM gateway against local stub OpenAI-compatible servers.
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import openai
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.services.llm_gateway import LLMGateway, LLMProvider, TokenBucket
+
+
+class StubServer:
+    """
+    Minimal chat-completions endpoint.
+
+    Each request consumes the next entry of ``script`` ("ok" or "429");
+    once the script is exhausted every request gets ``default``.
+    """
+
+    def __init__(
+        self,
+        script: List[str] = (),
+        default: str = "ok",
+        answer: str = "stub answer",
+        delay: float = 0.0,
+        retry_after: str = "0"
+    ):
+        self.script = list(script)
+        self.default = default
+        self.answer = answer
+        self.delay = delay
+        self.retry_after = retry_after
+        self.calls = 0
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers["Content-Length"]))
+                with stub._lock:
+                    stub.calls += 1
+                    action = stub.script.pop(0) if stub.script else stub.default
+                time.sleep(stub.delay)
+
+                if action == "429":
+                    body = b'{"error": {"message": "rate limited"}}'
+                    self.send_response(429)
+                    self.send_header("retry-after", stub.retry_after)
+                else:
+                    body = json.dumps({
+                        "id": "stub",
+                        "object": "chat.completion",
+                        "created": 0,
+                        "model": "stub",
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": stub.answer},
+                            "finish_reason": "stop"
+                        }],
+                        "usage": {"prompt_tokens": 10, "completion_tokens": 2, "total_tokens": 12}
+                    }).encode()
+                    self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v1"
+
+    def provider(self, name: str) -> LLMProvider:
+        return LLMProvider(name=name, base_url=self.url, api_key="test", model="stub")
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    servers = []
+
+    def start(**kwargs) -> StubServer:
+        server = StubServer(**kwargs)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+def make_gateway(providers, sleeps=None, **kwargs) -> LLMGateway:
+    sleeps = sleeps if sleeps is not None else []
+    options = {"max_retries": 2, "backoff_base": 0.001, "backoff_max": 5.0, "timeout": 5.0}
+    options.update(kwargs)
+    return LLMGateway(providers, sleep=sleeps.append, **options)
+
+
+def test_token_bucket_waits_for_refill():
+    now = [0.0]
+    sleeps = []
+
+    def sleep(seconds):
+        sleeps.append(seconds)
+        now[0] += seconds
+
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0], sleep=sleep)
+
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == 0.0
+    assert bucket.acquire() == pytest.approx(1.0)
+    assert sleeps == [pytest.approx(1.0)]
+
+
+def test_token_bucket_refills_over_time():
+    now = [0.0]
+    bucket = TokenBucket(60, capacity=1, clock=lambda: now[0], sleep=lambda s: None)
+
+    bucket.acquire()
+    now[0] += 1.0
+
+    assert bucket.acquire() == 0.0
+
+
+def test_concurrent_identical_prompts_are_coalesced(stub_server):
+    server = stub_server(delay=0.3)
+    gateway = make_gateway([server.provider("primary")])
+    answers = []
+
+    threads = [
+        threading.Thread(target=lambda: answers.append(gateway.invoke([HumanMessage("hi")]).content))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert answers == ["stub answer"] * 5
+    assert server.calls == 1
+
+
+def test_coalesced_followers_carry_no_usage(stub_server):
+    server = stub_server(delay=0.3)
+    gateway = make_gateway([server.provider("primary")])
+    responses = []
+
+    threads = [
+        threading.Thread(target=lambda: responses.append(gateway.invoke([HumanMessage("hi")])))
+        for _ in range(3)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    leaders = [r for r in responses if not r.response_metadata.get("coalesced")]
+    followers = [r for r in responses if r.response_metadata.get("coalesced")]
+    assert len(leaders) == 1 and len(followers) == 2
+    assert leaders[0].usage_metadata["input_tokens"] == 10
+    assert all(r.usage_metadata is None and r.content == "stub answer" for r in followers)
+
+
+def test_rate_limit_retry_honours_retry_after(stub_server):
+    server = stub_server(script=["429"], retry_after="2")
+    sleeps = []
+    gateway = make_gateway([server.provider("primary")], sleeps)
+
+    assert gateway.invoke([HumanMessage("hi")]).content == "stub answer"
+    assert server.calls == 2
+    assert sleeps == [2.0]
+
+
+def test_fails_over_after_max_retries(stub_server):
+    primary = stub_server(default="429")
+    secondary = stub_server(answer="from secondary")
+    sleeps = []
+    gateway = make_gateway([primary.provider("primary"), secondary.provider("fallback")], sleeps)
+
+    assert gateway.invoke([HumanMessage("hi")]).content == "from secondary"
+    assert primary.calls == 3
+    assert secondary.calls == 1
+    assert len(sleeps) == 2
+
+
+def test_slow_provider_times_out_and_fails_over(stub_server):
+    primary = stub_server(delay=1.0)
+    secondary = stub_server(answer="from secondary")
+    gateway = make_gateway(
+        [primary.provider("primary"), secondary.provider("fallback")],
+        max_retries=0,
+        timeout=0.2
+    )
+
+    assert gateway.invoke([HumanMessage("hi")]).content == "from secondary"
+    assert secondary.calls == 1
+
+
+def test_raises_when_all_providers_fail(stub_server):
+    server = stub_server(default="429")
+    gateway = make_gateway([server.provider("primary")], max_retries=1)
+
+    with pytest.raises(openai.RateLimitError):
+        gateway.invoke([HumanMessage("hi")])
+    assert server.calls == 2
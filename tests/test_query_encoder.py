@@ -0,0 +1,116 @@
+"""
+Tests for the cached, micro-batching query encoder.
+"""
+import threading
+from typing import List
+
+from src.services.query_encoder import QueryEncoder
+
+
+class RecordingEmbeddings:
+    """Embeds text as [length, call number] and records every call."""
+
+    def __init__(self, error: Exception = None):
+        self.error = error
+        self.query_calls: List[str] = []
+        self.batch_calls: List[List[str]] = []
+        self._lock = threading.Lock()
+
+    def embed_query(self, text: str) -> List[float]:
+        with self._lock:
+            self.query_calls.append(text)
+            return [float(len(text)), float(len(self.query_calls))]
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        with self._lock:
+            self.batch_calls.append(list(texts))
+            if self.error:
+                raise self.error
+            return [[float(len(text)), float(len(self.batch_calls))] for text in texts]
+
+
+def embed_concurrently(encoder: QueryEncoder, texts: List[str]) -> list:
+    results = [None] * len(texts)
+
+    def run(i):
+        try:
+            results[i] = encoder.embed_query(texts[i])
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(len(texts))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_lru_cache_evicts_least_recently_used():
+    embeddings = RecordingEmbeddings()
+    encoder = QueryEncoder(embeddings, cache_size=2, batch_window_ms=0)
+
+    for text in ["a", "b", "a", "c", "b", "a"]:
+        encoder.embed_query(text)
+
+    # "b" was evicted by "c", then "b" evicted "a" again
+    assert embeddings.query_calls == ["a", "b", "c", "b", "a"]
+    assert encoder.stats() == {"hits": 1, "misses": 5}
+
+
+def test_cache_ignores_surrounding_whitespace():
+    encoder = QueryEncoder(RecordingEmbeddings(), cache_size=4, batch_window_ms=0)
+
+    assert encoder.embed_query("  what is it? ") == encoder.embed_query("what is it?")
+    assert encoder.stats() == {"hits": 1, "misses": 1}
+
+
+def test_zero_window_uses_embed_query_directly():
+    embeddings = RecordingEmbeddings()
+    encoder = QueryEncoder(embeddings, cache_size=0, batch_window_ms=0)
+
+    encoder.embed_query("a")
+    encoder.embed_query("a")
+
+    assert embeddings.query_calls == ["a", "a"]
+    assert embeddings.batch_calls == []
+
+
+def test_concurrent_queries_share_one_batch():
+    embeddings = RecordingEmbeddings()
+    encoder = QueryEncoder(embeddings, cache_size=0, batch_window_ms=300, max_batch_size=32)
+
+    results = embed_concurrently(encoder, ["a", "bb", "a", "ccc", "bb"])
+
+    assert len(embeddings.batch_calls) == 1
+    assert sorted(embeddings.batch_calls[0]) == ["a", "bb", "ccc"]
+    assert [vector[0] for vector in results] == [1.0, 2.0, 1.0, 3.0, 2.0]
+    assert embeddings.query_calls == []
+
+
+def test_max_batch_size_splits_batches():
+    embeddings = RecordingEmbeddings()
+    encoder = QueryEncoder(embeddings, cache_size=0, batch_window_ms=300, max_batch_size=2)
+
+    results = embed_concurrently(encoder, ["a", "bb", "ccc", "dddd", "eeeee"])
+
+    assert all(len(batch) <= 2 for batch in embeddings.batch_calls)
+    assert sorted(text for batch in embeddings.batch_calls for text in batch) == [
+        "a", "bb", "ccc", "dddd", "eeeee"
+    ]
+    assert [vector[0] for vector in results] == [1.0, 2.0, 3.0, 4.0, 5.0]
+
+
+def test_encoder_error_reaches_every_waiting_caller():
+    embeddings = RecordingEmbeddings(error=RuntimeError("model crashed"))
+    encoder = QueryEncoder(embeddings, cache_size=8, batch_window_ms=300)
+
+    results = embed_concurrently(encoder, ["a", "a", "bb"])
+
+    assert len(embeddings.batch_calls) == 1
+    assert all(isinstance(r, RuntimeError) for r in results)
+
+    # The worker survives the failure and nothing was cached
+    embeddings.error = None
+    assert encoder.embed_query("a")[0] == 1.0
+    assert len(embeddings.batch_calls) == 2
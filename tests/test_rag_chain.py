@@ -0,0 +1,164 @@
+"""
+Tests for answer routing in the RAG chain.
+"""
+from typing import List
+
+import pytest
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage
+
+from config.settings import settings
+from src.services import rag_chain
+from src.services.history_store import InMemoryHistoryStore
+from src.services.rag_chain import RAGChain
+from src.utils.metrics import RouteMetrics
+
+
+class StubRetriever:
+    """Returns fixed chunks and scores, or raises for invalid options."""
+
+    def __init__(self, scores: List[float]):
+        self.scores = scores
+
+    def invoke_with_scores(self, query, **overrides):
+        if "unknown" in overrides:
+            raise TypeError("unexpected keyword argument 'unknown'")
+        docs = [Document(page_content=f"chunk {i}") for i in range(len(self.scores))]
+        return docs, list(self.scores)
+
+
+class StubGateway:
+    """Counts calls and answers with fixed text and usage."""
+
+    def __init__(self, answer: str = "full answer", coalesced: bool = False):
+        self.answer = answer
+        self.coalesced = coalesced
+        self.calls = 0
+
+    def invoke(self, prompt) -> AIMessage:
+        self.calls += 1
+        if self.coalesced:
+            return AIMessage(content=self.answer, response_metadata={"coalesced": True})
+        return AIMessage(
+            content=self.answer,
+            usage_metadata={"input_tokens": 100, "output_tokens": 5, "total_tokens": 105}
+        )
+
+    def stream(self, prompt):
+        self.calls += 1
+        yield from (self.answer[i:i + 8] for i in range(0, len(self.answer), 8))
+
+
+@pytest.fixture
+def metrics(monkeypatch) -> RouteMetrics:
+    metrics = RouteMetrics()
+    monkeypatch.setattr(rag_chain, "route_metrics", metrics)
+    monkeypatch.setattr(settings, "RETRIEVAL_MIN_SCORE", 0.2)
+    monkeypatch.setattr(settings, "FAST_ROUTE_MIN_SCORE", 0.6)
+    monkeypatch.setattr(settings, "FAST_ROUTE_MAX_WORDS", 12)
+    monkeypatch.setattr(settings, "LLM_FAST_MODEL", "")
+    return metrics
+
+
+def make_chain(scores, gateway=None, fast_gateway=None) -> RAGChain:
+    return RAGChain(
+        StubRetriever(scores),
+        gateway=gateway or StubGateway(),
+        history_store=InMemoryHistoryStore(),
+        fast_gateway=fast_gateway
+    )
+
+
+@pytest.mark.parametrize("scores", [[], [0.1, 0.05]])
+def test_no_context_skips_llm(metrics, scores):
+    gateway = StubGateway()
+    chain = make_chain(scores, gateway)
+
+    answer, history = chain.ask("What is the refund policy?", session_id="s1")
+
+    assert answer == RAGChain.NOT_AVAILABLE_ANSWER
+    assert gateway.calls == 0
+    assert [m.content for m in history] == ["What is the refund policy?", answer]
+    assert metrics.snapshot()["no_context"]["requests"] == 1
+    assert metrics.snapshot()["no_context"]["llm_calls"] == 0
+
+
+def test_low_scoring_follow_up_in_ongoing_session_reaches_llm(metrics):
+    gateway = StubGateway()
+    chain = make_chain([0.9], gateway)
+    chain.ask("What are the main findings?", session_id="s1")
+
+    chain.retriever.scores = [0.1]
+    answer, _ = chain.ask("Can you expand on the second point?", session_id="s1")
+
+    assert answer == "full answer"
+    assert gateway.calls == 2
+    assert metrics.snapshot()["no_context"]["requests"] == 0
+    assert metrics.snapshot()["full"]["requests"] == 2
+
+
+def test_short_question_with_strong_match_uses_fast_model(metrics):
+    gateway, fast = StubGateway(), StubGateway("fast answer")
+    chain = make_chain([0.9, 0.7], gateway, fast)
+
+    answer, _ = chain.ask("Who wrote the report?")
+
+    assert answer == "fast answer"
+    assert (gateway.calls, fast.calls) == (0, 1)
+    assert metrics.snapshot()["fast"]["llm_calls"] == 1
+    assert metrics.snapshot()["fast"]["context_chunks"] == 2
+    assert metrics.snapshot()["fast"]["input_tokens"] == 100
+
+
+@pytest.mark.parametrize("question, top_score", [
+    ("Who wrote the report?", 0.5),
+    ("Compare the methodology of the second study with the results discussed in chapter four", 0.9),
+])
+def test_weak_match_or_long_question_uses_full_model(metrics, question, top_score):
+    gateway, fast = StubGateway(), StubGateway("fast answer")
+    chain = make_chain([top_score], gateway, fast)
+
+    assert chain.ask(question)[0] == "full answer"
+    assert (gateway.calls, fast.calls) == (1, 0)
+    assert metrics.snapshot()["full"]["output_tokens"] == 5
+
+
+def test_without_fast_model_everything_goes_full(metrics):
+    gateway = StubGateway()
+    chain = make_chain([0.9], gateway)
+
+    chain.ask("Who wrote the report?")
+
+    assert gateway.calls == 1
+    assert metrics.snapshot()["fast"]["requests"] == 0
+
+
+def test_coalesced_answer_is_not_counted_as_llm_call(metrics):
+    chain = make_chain([0.5], StubGateway(coalesced=True))
+
+    chain.ask("Who wrote the report?")
+
+    counters = metrics.snapshot()["full"]
+    assert counters["requests"] == 1
+    assert counters["llm_calls"] == 0
+    assert counters["coalesced"] == 1
+    assert counters["input_tokens"] == counters["context_chunks"] == 0
+
+
+def test_stream_rejects_invalid_options_before_iterating(metrics):
+    gateway = StubGateway()
+    chain = make_chain([0.9], gateway)
+
+    with pytest.raises(TypeError):
+        chain.stream("Who wrote the report?", {"unknown": 1})
+    assert gateway.calls == 0
+
+
+def test_stream_saves_the_full_turn(metrics):
+    chain = make_chain([0.5], StubGateway("streamed full answer"))
+
+    chunks = list(chain.stream("Who wrote the report?", session_id="s1"))
+
+    assert len(chunks) > 1 and "".join(chunks) == "streamed full answer"
+    assert chain.get_history("s1")[-1].content == "streamed full answer"
+    assert metrics.snapshot()["full"]["llm_calls"] == 1
@@ -0,0 +1,181 @@
+"""
+Unit tests for the NumPy retriever and its retrieval modes.
+"""
+import os
+from typing import List
+
+import numpy as np
+import pytest
+from langchain_community.vectorstores import FAISS
+from langchain_core.embeddings import Embeddings
+
+from src.services.retriever import (
+    RetrievalConfig,
+    VectorRetriever,
+    _adaptive_k,
+    _mmr_select,
+    _top_per_source,
+)
+
+
+class FixedQueryEmbeddings(Embeddings):
+    """Embeds every query as the same vector."""
+
+    def __init__(self, vector: List[float]):
+        self.vector = vector
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.vector for _ in texts]
+
+
+# (text, vector, source, 0-based page)
+ROWS = [
+    ("a0", [1.0, 0.0, 0.0], "a.pdf", 0),
+    ("a1", [0.99, 0.02, 0.1], "a.pdf", 1),
+    ("a2", [0.98, 0.03, 0.12], "a.pdf", 2),
+    ("b0", [0.6, 0.8, 0.0], "b.pdf", 0),
+    ("b5", [0.0, 0.0, 1.0], "b.pdf", 5),
+]
+QUERY = [0.9, 0.3, 0.1]
+
+
+def build_vectorstore(rows, embeddings) -> FAISS:
+    return FAISS.from_embeddings(
+        [(text, vector) for text, vector, _, _ in rows],
+        embeddings,
+        metadatas=[{"source": f"/tmp/{source}", "page": page} for _, _, source, page in rows]
+    )
+
+
+@pytest.fixture
+def retriever() -> VectorRetriever:
+    embeddings = FixedQueryEmbeddings(QUERY)
+    return VectorRetriever(
+        build_vectorstore(ROWS, embeddings),
+        embeddings,
+        RetrievalConfig(k=2, adaptive_k=False)
+    )
+
+
+def texts(docs) -> List[str]:
+    return [doc.page_content for doc in docs]
+
+
+def test_similarity_returns_top_k_by_score(retriever):
+    docs, scores = retriever.invoke_with_scores("q")
+
+    assert texts(docs) == ["a2", "a1"]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_mmr_skips_near_duplicate(retriever):
+    assert texts(retriever.invoke("q", search_type="mmr")) == ["a2", "b0"]
+
+
+def test_per_source_quota(retriever):
+    docs = retriever.invoke("q", max_per_source=1, k=3)
+
+    assert texts(docs) == ["a2", "b0"]
+
+
+@pytest.mark.parametrize("search_type", ["similarity", "mmr"])
+def test_quota_reaches_past_a_dominant_document(search_type):
+    # 30 near-identical a.pdf chunks outscore every b.pdf chunk and fill fetch_k
+    rows = [(f"a{i}", [1.0, 0.01 * i, 0.0], "a.pdf", i) for i in range(30)]
+    rows += [(f"b{i}", [0.5, 0.0, 0.5 + 0.1 * i], "b.pdf", i) for i in range(3)]
+    embeddings = FixedQueryEmbeddings([1.0, 0.0, 0.0])
+    retriever = VectorRetriever(
+        build_vectorstore(rows, embeddings),
+        embeddings,
+        RetrievalConfig(k=4, adaptive_k=False)
+    )
+
+    docs = retriever.invoke("q", search_type=search_type, max_per_source=2)
+
+    assert len(docs) == 4
+    assert sorted(os.path.basename(d.metadata["source"]) for d in docs) == ["a.pdf"] * 2 + ["b.pdf"] * 2
+
+
+def test_top_per_source_keeps_best_of_each_source():
+    scores = np.array([0.9, 0.8, 0.7, 0.3, 0.2, 0.1], dtype=np.float32)
+    source_ids = np.array([0, 0, 0, 1, 1, 2], dtype=np.int64)
+
+    kept = _top_per_source(np.arange(6), scores, source_ids, 2)
+
+    assert kept.tolist() == [0, 1, 3, 4, 5]
+
+
+def test_source_filter(retriever):
+    assert texts(retriever.invoke("q", sources=["b.pdf"])) == ["b0", "b5"]
+
+
+def test_page_range_is_one_based_and_inclusive(retriever):
+    docs = retriever.invoke("q", page_range=(2, 3), k=5)
+
+    assert texts(docs) == ["a2", "a1"]
+    assert sorted(doc.metadata["page"] for doc in docs) == [1, 2]
+
+
+def test_filter_without_matches_returns_nothing(retriever):
+    assert retriever.invoke_with_scores("q", sources=["missing.pdf"]) == ([], [])
+
+
+def test_sources_lists_file_names(retriever):
+    assert retriever.sources == ["a.pdf", "b.pdf"]
+
+
+def test_invalid_config_raises(retriever):
+    with pytest.raises(ValueError):
+        retriever.invoke("q", search_type="unknown")
+    with pytest.raises(ValueError):
+        retriever.invoke("q", page_range=(5, 2))
+
+
+def test_refresh_detects_replaced_index_of_same_size(retriever):
+    embeddings = FixedQueryEmbeddings(QUERY)
+    replacement = build_vectorstore(
+        [(f"new-{text}", vector, source, page) for text, vector, source, page in ROWS],
+        embeddings
+    )
+    retriever.vectorstore.index = replacement.index
+    retriever.vectorstore.docstore = replacement.docstore
+    retriever.vectorstore.index_to_docstore_id = replacement.index_to_docstore_id
+
+    assert texts(retriever.invoke("q")) == ["new-a2", "new-a1"]
+
+
+def test_mmr_select_diversifies():
+    vectors = np.array([[1.0, 0.0], [1.0, 0.0], [0.0, 1.0]], dtype=np.float32)
+    relevance = np.array([0.9, 0.9, 0.5], dtype=np.float32)
+    source_ids = np.zeros(3, dtype=np.int64)
+
+    assert _mmr_select(vectors, relevance, source_ids, 2, 1.0, 0) == [0, 1]
+    assert _mmr_select(vectors, relevance, source_ids, 2, 0.5, 0) == [0, 2]
+
+
+def test_mmr_select_quota_stops_when_sources_exhausted():
+    vectors = np.eye(3, dtype=np.float32)
+    relevance = np.array([0.9, 0.8, 0.7], dtype=np.float32)
+    source_ids = np.array([0, 0, 1], dtype=np.int64)
+
+    assert _mmr_select(vectors, relevance, source_ids, 3, 1.0, 1) == [0, 2]
+
+
+@pytest.mark.parametrize("scores, min_k, expected", [
+    ([0.9, 0.88, 0.5, 0.49], 1, 2),
+    ([0.9, 0.5, 0.49], 1, 1),
+    ([0.9, 0.5, 0.49], 2, 3),
+    ([0.9, 0.85, 0.8], 1, 3),
+    ([0.9], 1, 1),
+    ([], 1, 0),
+])
+def test_adaptive_k_cuts_at_first_large_gap(scores, min_k, expected):
+    assert _adaptive_k(np.array(scores, dtype=np.float32), min_k, 0.1) == expected
+
+
+def test_adaptive_k_drops_weak_tail(retriever):
+    assert texts(retriever.invoke("q", k=4)) == ["a2", "a1", "a0", "b0"]
+    assert texts(retriever.invoke("q", k=4, adaptive_k=True, score_gap=0.1)) == ["a2", "a1", "a0"]
@@ -0,0 +1,85 @@
+"""
+Tests for the REST server's query endpoints.
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+import server
+
+
+class StubEngine:
+    """Engine that answers with fixed text, or fails for the question "crash"."""
+
+    ready = True
+    vectorstore_service = SimpleNamespace(
+        query_encoder=SimpleNamespace(stats=lambda: {"hits": 3, "misses": 1})
+    )
+
+    def ask(self, question, session_id, search_kwargs):
+        if question == "crash":
+            raise ValueError("internal detail")
+        return f"answer to {question}", []
+
+    def stream(self, question, session_id, search_kwargs):
+        if question == "crash":
+            raise ValueError("internal detail")
+        return iter(["answer ", "to ", question])
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server, "get_engine", StubEngine)
+    # Not used as a context manager, so the lifespan (API key check) is skipped
+    return TestClient(server.app)
+
+
+def test_stream_returns_chunks(client):
+    response = client.post("/query/stream", json={"question": "hi"})
+
+    assert response.status_code == 200
+    assert response.text == "answer to hi"
+
+
+@pytest.mark.parametrize("path", ["/query", "/query/stream"])
+@pytest.mark.parametrize("search_kwargs", [
+    {"unknown": 1},
+    {"search_type": "nope"},
+    {"k": 0},
+    {"page_range": [5, 2]},
+])
+def test_invalid_search_kwargs_are_rejected_with_400(client, path, search_kwargs):
+    response = client.post(path, json={"question": "hi", "search_kwargs": search_kwargs})
+
+    assert response.status_code == 400
+    assert response.json()["detail"].startswith("Invalid search_kwargs")
+
+
+@pytest.mark.parametrize("path", ["/query", "/query/stream"])
+def test_valid_search_kwargs_are_passed_through(client, path):
+    response = client.post(
+        path, json={"question": "hi", "search_kwargs": {"k": 2, "search_type": "mmr"}}
+    )
+
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize("path", ["/query", "/query/stream"])
+def test_engine_errors_are_not_reported_as_bad_requests(monkeypatch, path):
+    monkeypatch.setattr(server, "get_engine", StubEngine)
+    client = TestClient(server.app, raise_server_exceptions=False)
+
+    response = client.post(path, json={"question": "crash"})
+
+    assert response.status_code == 500
+    assert "internal detail" not in response.text
+
+
+def test_metrics_include_query_cache_counters(client):
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert "# TYPE rag_route_requests_total counter" in response.text
+    assert "rag_query_cache_hits_total 3" in response.text
+    assert "rag_query_cache_misses_total 1" in response.text